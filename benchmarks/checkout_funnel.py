@@ -0,0 +1,347 @@
+"""
+주문 과정(상품 목록 → 장바구니 담기 → 장바구니 수정 → 주문 생성 → 결제 → 결제 확인)
+전체에 대한 부하 테스트.
+
+포트원 API 대신 mall.portone_simulator 를 띄우고, 그 서버를 바라보는
+Django 서버를 실행한 다음, 동시 사용자 수를 늘려가며 단계별 처리량과 p50/p95/p99
+응답시간을 측정해서 JSON으로 저장한다. 커밋 간 비교를 위해 git 커밋도 함께 기록.
+
+    DATABASE_URL=sqlite:////tmp/bench.db python manage.py migrate
+    DATABASE_URL=sqlite:////tmp/bench.db python manage.py load_products
+    DATABASE_URL=sqlite:////tmp/bench.db python benchmarks/checkout_funnel.py \\
+        --concurrency 1,4,16 --rounds 5 --portone-latency-ms 200 --output bench.json
+
+--base-url 로 이미 실행 중인 서버를 지정할 수도 있다. 이 경우 서버의
+PORTONE_API_URL 은 직접 --portone-port 의 주소로 지정해야 한다. 결제건은 이 스크립트가
+실행한 시뮬레이터에 등록되므로 run_portone_simulator 를 따로 띄우면 안 된다.
+상품 목록에 판매중(status=a)인 상품이 있어야 한다. SQLite는 동시 쓰기에서
+"database is locked" 오류가 나므로, 동시 사용자 수를 늘려 볼 때는 PostgreSQL로 측정.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+from uuid import uuid4
+
+import httpx
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from mall.portone_simulator import PortoneSimulator, SimulatorConfig  # noqa: E402
+
+STEP_NAMES = [
+    "product_list",
+    "add_to_cart",
+    "cart_detail",
+    "update_cart",
+    "order_new",
+    "order_pay",
+    "order_check",
+]
+
+PRODUCT_ADD_URL_RE = re.compile(r'href="(/mall/cart/\d+/add/)"')
+FORM_ID_RE = re.compile(r'name="(form-\d+-id)" value="(\d+)"')
+NEXT_URL_RE = re.compile(r'const next_url = "([^"]+)"')
+PAYMENT_PROPS_RE = re.compile(r'<script id="payment-props"[^>]*>(.*?)</script>')
+
+
+def start_django_server(port: int, portone_url: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        DEBUG="false",
+        ALLOWED_HOSTS="127.0.0.1,localhost",
+        PORTONE_API_URL=portone_url,
+        PORTONE_API_KEY=os.environ.get("PORTONE_API_KEY", "bench"),
+        PORTONE_API_SECRET=os.environ.get("PORTONE_API_SECRET", "bench"),
+    )
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "manage.py",
+            "runserver",
+            f"127.0.0.1:{port}",
+            "--noreload",
+        ],
+        cwd=BASE_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            httpx.get(base_url + "/mall/", timeout=1)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("django server did not start")
+
+
+def get_git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=BASE_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class FunnelUser:
+    """로그인한 세션 하나로 주문 과정을 반복하는 가상 사용자"""
+
+    def __init__(
+        self,
+        base_url: str,
+        simulator: PortoneSimulator,
+        timings: dict,
+        errors: dict,
+    ):
+        self.simulator = simulator
+        self.timings = timings
+        self.errors = errors
+        # runserver는 keep-alive 연결에서 응답마다 ~40ms(delayed ACK)씩 지연되므로
+        # 요청마다 새로 연결
+        self.session = httpx.Client(
+            base_url=base_url,
+            limits=httpx.Limits(max_keepalive_connections=0),
+            timeout=60,
+        )
+
+    def request(self, step: str, method: str, path: str, **kwargs):
+        headers = kwargs.pop("headers", {})
+        if method == "POST":
+            headers["X-CSRFToken"] = self.session.cookies.get("csrftoken", "")
+
+        started_at = time.perf_counter()
+        try:
+            response = self.session.request(method, path, headers=headers, **kwargs)
+        except httpx.HTTPError:
+            self.errors[step] += 1
+            return None
+        elapsed = time.perf_counter() - started_at
+
+        if response.status_code >= 400:
+            self.errors[step] += 1
+            return None
+        self.timings[step].append(elapsed)
+        return response
+
+    def signup_and_login(self):
+        username = f"bench-{uuid4().hex[:12]}"
+        password = uuid4().hex
+
+        self.session.get("/accounts/signup/")
+        self.session.post(
+            "/accounts/signup/",
+            data={"username": username, "password1": password, "password2": password},
+            headers={"X-CSRFToken": self.session.cookies.get("csrftoken", "")},
+        )
+        self.session.get("/accounts/login/")
+        response = self.session.post(
+            "/accounts/login/",
+            data={"username": username, "password": password},
+            headers={"X-CSRFToken": self.session.cookies.get("csrftoken", "")},
+        )
+        if response.status_code != 302:
+            raise RuntimeError(f"login failed: {response.status_code}")
+
+    def run_funnel(self, round_no: int):
+        response = self.request("product_list", "GET", "/mall/")
+        if response is None:
+            return
+        add_url_list = PRODUCT_ADD_URL_RE.findall(response.text)
+        if not add_url_list:
+            raise RuntimeError("no active products in the catalog")
+
+        add_url = add_url_list[round_no % len(add_url_list)]
+        if self.request("add_to_cart", "POST", add_url + "?quantity=1") is None:
+            return
+
+        response = self.request("cart_detail", "GET", "/mall/cart")
+        if response is None:
+            return
+        form_id_list = FORM_ID_RE.findall(response.text)
+        data = {
+            "form-TOTAL_FORMS": len(form_id_list),
+            "form-INITIAL_FORMS": len(form_id_list),
+        }
+        for name, value in form_id_list:
+            data[name] = value
+            data[name.replace("-id", "-quantity")] = 2
+        if self.request("update_cart", "POST", "/mall/cart", data=data) is None:
+            return
+
+        response = self.request("order_new", "GET", "/mall/order/new/")
+        if response is None:
+            return
+        pay_url = response.headers["location"]
+
+        response = self.request("order_pay", "GET", pay_url)
+        if response is None:
+            return
+        check_url = NEXT_URL_RE.search(response.text).group(1)
+
+        # 브라우저의 IMP.request_pay() 대신 시뮬레이터에 결제건을 등록
+        payment_props = json.loads(PAYMENT_PROPS_RE.search(response.text).group(1))
+        self.simulator.register_payment(
+            payment_props["merchant_uid"], payment_props["amount"]
+        )
+
+        self.request("order_check", "GET", check_url)
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(p / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def run_level(
+    base_url: str, simulator: PortoneSimulator, concurrency: int, rounds: int
+) -> dict:
+    timings = defaultdict(list)
+    errors = defaultdict(int)
+    user_list = [
+        FunnelUser(base_url, simulator, timings, errors) for _ in range(concurrency)
+    ]
+    simulator.reset()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(FunnelUser.signup_and_login, user_list))
+
+        def run_user(user: FunnelUser):
+            for round_no in range(rounds):
+                user.run_funnel(round_no)
+
+        started_at = time.perf_counter()
+        list(executor.map(run_user, user_list))
+        elapsed = time.perf_counter() - started_at
+
+    for user in user_list:
+        user.session.close()
+
+    step_dict = {}
+    for step in STEP_NAMES:
+        values = sorted(timings[step])
+        step_dict[step] = {
+            "count": len(values),
+            "errors": errors[step],
+            "requests_per_second": len(values) / elapsed,
+            "mean_ms": statistics.fmean(values) * 1000 if values else 0.0,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+        }
+
+    return {
+        "concurrency": concurrency,
+        "elapsed_seconds": elapsed,
+        "portone_calls": simulator.stats()["calls"],
+        "funnels_per_second": len(timings["order_check"]) / elapsed,
+        "steps": step_dict,
+    }
+
+
+def print_level(result: dict):
+    print(
+        f"\nconcurrency={result['concurrency']} "
+        f"({result['funnels_per_second']:.1f} funnels/s)"
+    )
+    print(f"{'step':<14}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}")
+    for step, stats in result["steps"].items():
+        print(
+            f"{step:<14}{stats['requests_per_second']:>9.1f}"
+            f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}"
+            f"{stats['p99_ms']:>9.1f}{stats['errors']:>8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--base-url", help="use an already running server instead of starting one"
+    )
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--portone-port", type=int, default=8101)
+    parser.add_argument("--portone-latency-ms", type=float, default=100)
+    parser.add_argument("--portone-jitter-ms", type=float, default=0)
+    parser.add_argument("--portone-error-rate", type=float, default=0)
+    parser.add_argument(
+        "--portone-statuses",
+        default="paid",
+        help="statuses returned by successive finds of a payment, e.g. ready,paid",
+    )
+    parser.add_argument(
+        "--concurrency",
+        default="1,4,16",
+        help="comma separated concurrent users per level",
+    )
+    parser.add_argument("--rounds", type=int, default=5, help="funnels per user")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    args = parser.parse_args()
+
+    simulator = PortoneSimulator(
+        SimulatorConfig(
+            latency=args.portone_latency_ms / 1000,
+            jitter=args.portone_jitter_ms / 1000,
+            error_rate=args.portone_error_rate,
+            default_statuses=args.portone_statuses.split(","),
+        )
+    ).start(port=args.portone_port)
+    portone_url = simulator.url
+
+    django_process = None
+    base_url = args.base_url
+    if base_url is None:
+        django_process = start_django_server(args.port, portone_url)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        result_list = []
+        for concurrency in map(int, args.concurrency.split(",")):
+            result = run_level(
+                base_url.rstrip("/"), simulator, concurrency, args.rounds
+            )
+            print_level(result)
+            result_list.append(result)
+    finally:
+        if django_process is not None:
+            django_process.terminate()
+            django_process.wait()
+        simulator.stop()
+
+    report = {
+        "git_commit": get_git_commit(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {
+            "base_url": base_url,
+            "portone_latency_ms": args.portone_latency_ms,
+            "portone_jitter_ms": args.portone_jitter_ms,
+            "portone_error_rate": args.portone_error_rate,
+            "portone_statuses": args.portone_statuses,
+            "rounds": args.rounds,
+        },
+        "results": result_list,
+    }
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"\nwrote {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
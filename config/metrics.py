@@ -0,0 +1,293 @@
+"""
+뷰별 요청 처리 지표(쿼리 수, DB 시간, 포트원 API 시간, 전체 처리 시간) 수집.
+운영 환경에서도 켜둘 수 있도록 프로세스 메모리에 히스토그램으로만 누적하고,
+METRICS_TOKEN 또는 METRICS_ALLOWED_IPS로 접근을 허용한 /metrics/ 에서 Prometheus text 형식으로 내보낸다.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from mall.portone import portone_called
+
+
+logger = logging.getLogger("metrics")
+
+# 초 단위 지연시간 버킷
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # view -> [버킷별 개수..., 합계, 개수]
+        self._values: dict[str, list] = {}
+
+    def observe(self, view: str, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            values = self._values.get(view)
+            if values is None:
+                values = self._values[view] = [0] * len(self.buckets) + [0, 0]
+            if index < len(self.buckets):
+                values[index] += 1
+            values[-2] += value
+            values[-1] += 1
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            items = sorted(
+                (view, list(values)) for view, values in self._values.items()
+            )
+
+        for view, values in items:
+            label = f'view="{escape_label(view)}"'
+            cumulative = 0
+            for bucket, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(
+                    f'{self.name}_bucket{{{label},le="{bucket}"}} {cumulative}'
+                )
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {values[-1]}')
+            lines.append(f"{self.name}_sum{{{label}}} {values[-2]}")
+            lines.append(f"{self.name}_count{{{label}}} {values[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_name: str):
+        self.name = name
+        self.help_text = help_text
+        self.label_name = label_name
+        self._lock = threading.Lock()
+        self._values: dict[str, float] = {}
+
+    def inc(self, label: str, amount: float = 1):
+        with self._lock:
+            self._values[label] = self._values.get(label, 0) + amount
+
+    def get(self, label: str) -> float:
+        with self._lock:
+            return self._values.get(label, 0)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} counter",
+        ]
+        with self._lock:
+            items = sorted(self._values.items())
+        for label, value in items:
+            lines.append(
+                f'{self.name}{{{self.label_name}="{escape_label(label)}"}} {value}'
+            )
+        return lines
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+request_duration = Histogram(
+    "django_view_duration_seconds",
+    "Wall time spent handling a request",
+    DURATION_BUCKETS,
+)
+db_query_count = Histogram(
+    "django_view_db_queries",
+    "Number of database queries per request",
+    QUERY_COUNT_BUCKETS,
+)
+db_duration = Histogram(
+    "django_view_db_duration_seconds",
+    "Time spent in database queries per request",
+    DURATION_BUCKETS,
+)
+portone_duration = Histogram(
+    "django_view_portone_duration_seconds",
+    "Time spent in PortOne API calls per request",
+    DURATION_BUCKETS,
+)
+
+HISTOGRAMS = [request_duration, db_query_count, db_duration, portone_duration]
+
+product_card_cache = Counter(
+    "mall_product_card_cache_total",
+    "Product card render cache lookups",
+    "result",
+)
+
+COUNTERS = [product_card_cache]
+
+
+@dataclass
+class RequestMetrics:
+    query_count: int = 0
+    db_time: float = 0.0
+    portone_time: float = 0.0
+
+
+# 현재 요청의 지표. sync_to_async/async_to_sync 경계에서도 그대로 전달된다.
+_current_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar(
+    "request_metrics", default=None
+)
+
+
+@receiver(portone_called)
+def record_portone_call(sender, endpoint, elapsed, **kwargs):
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        metrics.portone_time += elapsed
+
+
+def get_view_name(request) -> str:
+    resolver_match = getattr(request, "resolver_match", None)
+    if resolver_match is None:
+        return "<unresolved>"
+    return resolver_match.view_name
+
+
+def get_query_budget(view_name: str) -> int:
+    return settings.METRICS_QUERY_BUDGETS.get(view_name, settings.METRICS_QUERY_BUDGET)
+
+
+def count_query(execute, sql, params, many, context):
+    """
+    현재 요청의 쿼리 수/시간을 누적하는 execute_wrapper.
+    sync_to_async로 다른 스레드의 커넥션에서 실행되어도 ContextVar로 같은 요청의 지표를 찾는다
+    """
+
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    started_at = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.query_count += 1
+        metrics.db_time += time.perf_counter() - started_at
+
+
+def install_query_counter(connection):
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+@receiver(connection_created)
+def on_connection_created(sender, connection, **kwargs):
+    install_query_counter(connection)
+
+
+class MetricsMiddleware:
+    """
+    동기/비동기 요청을 모두 지원. ASGI에서 비동기 뷰(order_check_async 등)가
+    동기 middleware 때문에 스레드에서 실행되지 않도록 async 체인을 그대로 유지한다.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        # 이미 연결된 커넥션에도 설치 (새 커넥션은 connection_created에서 설치)
+        for connection in connections.all():
+            install_query_counter(connection)
+
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        started_at = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+
+        self.record(request, metrics, time.perf_counter() - started_at)
+        return response
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        started_at = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+
+        self.record(request, metrics, time.perf_counter() - started_at)
+        return response
+
+    @staticmethod
+    def record(request, metrics: RequestMetrics, elapsed: float):
+        view_name = get_view_name(request)
+        request_duration.observe(view_name, elapsed)
+        db_query_count.observe(view_name, metrics.query_count)
+        db_duration.observe(view_name, metrics.db_time)
+        portone_duration.observe(view_name, metrics.portone_time)
+
+        budget = get_query_budget(view_name)
+        if metrics.query_count > budget:
+            logger.warning(
+                "%s exceeded query budget: %d queries (budget %d), %s %s",
+                view_name,
+                metrics.query_count,
+                budget,
+                request.method,
+                request.path,
+            )
+
+
+def is_metrics_allowed(request) -> bool:
+    if settings.METRICS_TOKEN:
+        authorization = request.META.get("HTTP_AUTHORIZATION", "")
+        if constant_time_compare(authorization, f"Bearer {settings.METRICS_TOKEN}"):
+            return True
+    return request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS
+
+
+def metrics_view(request):
+    if not is_metrics_allowed(request):
+        raise Http404
+
+    lines = []
+    for metric in HISTOGRAMS + COUNTERS:
+        lines.extend(metric.render())
+    return HttpResponse(
+        "\n".join(lines) + "\n",
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
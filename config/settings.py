@@ -65,6 +65,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "config.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -87,6 +88,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "mall.context_processors.cart_summary",
             ],
         },
     },
@@ -102,6 +104,12 @@ WSGI_APPLICATION = "config.wsgi.application"
 DATABASES = {"default": env.db("DATABASE_URL", default=f"{BASE_DIR} / 'db.sqlite3'")}
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -154,7 +162,42 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # django_debug_toolbar
 INTERNAL_IPS = env.list("INTERNAL_IPS", default=["127.0.0.1"])
 
+# metrics
+# 요청당 쿼리 수가 이보다 많으면 경고 로그를 남김 (URL 이름별로 따로 지정 가능)
+METRICS_QUERY_BUDGET = env.int("METRICS_QUERY_BUDGET", default=20)
+METRICS_QUERY_BUDGETS = {}
+# /metrics/ 접근 허용. 리버스 프록시 뒤에서는 모든 요청이 프록시 주소로 보이므로
+# METRICS_TOKEN("Authorization: Bearer <token>")을 사용
+METRICS_TOKEN = env.str("METRICS_TOKEN", default="")
+METRICS_ALLOWED_IPS = env.list("METRICS_ALLOWED_IPS", default=[])
+
+# mall
+MALL_CATALOG_PAGINATION = env.str("MALL_CATALOG_PAGINATION", default="keyset")
+MALL_CATALOG_CACHE_TIMEOUT = env.int("MALL_CATALOG_CACHE_TIMEOUT", default=60 * 5)
+MALL_CART_SUMMARY_CACHE_TIMEOUT = env.int(
+    "MALL_CART_SUMMARY_CACHE_TIMEOUT", default=60 * 60
+)
+# 상품 카드는 상품이 바뀌면 키가 바뀌므로 오래 캐싱
+MALL_PRODUCT_CARD_CACHE_TIMEOUT = env.int(
+    "MALL_PRODUCT_CARD_CACHE_TIMEOUT", default=60 * 60 * 24
+)
+# 배송완료/주문취소 주문의 상세 페이지 캐시
+MALL_ORDER_DETAIL_CACHE_TIMEOUT = env.int(
+    "MALL_ORDER_DETAIL_CACHE_TIMEOUT", default=60 * 10
+)
+# 상품 사진 저장 시 썸네일을 백그라운드 스레드에서 생성
+MALL_THUMBNAIL_ASYNC = env.bool("MALL_THUMBNAIL_ASYNC", default=True)
+MALL_THUMBNAIL_WORKERS = env.int("MALL_THUMBNAIL_WORKERS", default=2)
+
 # Portone
 PORTONE_SHOP_ID = env.str("PORTONE_SHOP_ID", default="")
 PORTONE_API_KEY = env.str("PORTONE_API_KEY", default="")
 PORTONE_API_SECRET = env.str("PORTONE_API_SECRET", default="")
+# 로컬 시뮬레이터를 쓰려면 run_portone_simulator 주소로 지정 (예: http://127.0.0.1:8101/)
+PORTONE_API_URL = env.str("PORTONE_API_URL", default="https://api.iamport.kr/")
+# 포트원 API 응답 대기시간(초)
+PORTONE_TIMEOUT = env.float("PORTONE_TIMEOUT", default=10)
+PORTONE_POOL_MAXSIZE = env.int("PORTONE_POOL_MAXSIZE", default=10)
+PORTONE_ASYNC_POOL_MAXSIZE = env.int("PORTONE_ASYNC_POOL_MAXSIZE", default=100)
+# ASGI로 서비스할 때 order_check를 비동기 뷰로 처리
+PORTONE_ASYNC_CHECK = env.bool("PORTONE_ASYNC_CHECK", default=False)
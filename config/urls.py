@@ -4,11 +4,14 @@ from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import TemplateView
 
+from config.metrics import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("accounts/", include("accounts.urls")),
     path("mall/", include("mall.urls")),
     path("mall_sample/", include("mall_sample.urls")),
+    path("metrics/", metrics_view, name="metrics"),
     path("", TemplateView.as_view(template_name="root.html"), name="root"),
 ]
 
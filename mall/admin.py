@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Category, Product, CartProduct
+from django.db import transaction
+from .cache import invalidate_catalog
+from .facets import refresh_facets
+from .models import Category, Product, ProductFacet, CartProduct
 
 
 @admin.register(Category)
@@ -19,12 +22,22 @@ class ProductAdmin(admin.ModelAdmin):
 
     @admin.display(description=f"지정된 상품을 {Product.Status.ACTIVE.label} 상태로 변경")
     def make_active(self, request, queryset):
+        category_pk_set = set(queryset.values_list("category_id", flat=True))
         count = queryset.update(status=Product.Status.ACTIVE)
+        # update()는 post_save 시그널을 발생시키지 않으므로 직접 재집계/무효화
+        refresh_facets(category_pk_set)
+        transaction.on_commit(invalidate_catalog)
         self.message_user(
             request, f"{count}개의 상품을 {Product.Status.ACTIVE.label} 상태로 변경 완료"
         )
 
 
+@admin.register(ProductFacet)
+class ProductFacetAdmin(admin.ModelAdmin):
+    list_display = ["category", "price_band", "product_count"]
+    list_filter = ["category"]
+
+
 @admin.register(CartProduct)
 class CartProductAdmin(admin.ModelAdmin):
     list_display = ["user", "product", "quantity"]
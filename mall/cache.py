@@ -0,0 +1,132 @@
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Sum
+
+from config.metrics import product_card_cache
+from mall.models import CartProduct, Order, Product
+
+
+CATALOG_VERSION_KEY = "mall:catalog:version"
+
+
+def get_catalog_version() -> int:
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        version = invalidate_catalog()
+    return version
+
+
+def invalidate_catalog() -> int:
+    """
+    버전을 바꿔서 캐싱된 상품 목록 페이지를 모두 무효화.
+    버전 키가 캐시에서 밀려나더라도 예전 버전과 겹치지 않도록 시각을 버전으로 사용
+    """
+
+    version = time.time_ns()
+    cache.set(CATALOG_VERSION_KEY, version, timeout=None)
+    return version
+
+
+def get_or_render_catalog_page(page_key: str, render: Callable[[], str]) -> str:
+    key = f"mall:catalog:{get_catalog_version()}:{page_key}"
+    html = cache.get(key)
+    if html is None:
+        html = render()
+        cache.set(key, html, timeout=settings.MALL_CATALOG_CACHE_TIMEOUT)
+    return html
+
+
+def get_product_card_key(product: Product) -> str:
+    """
+    상품이 바뀌면 updated_at이, 카테고리명이 바뀌면 이름 해시가 바뀌어 새 키가 된다.
+    (썸네일 생성도 updated_at을 갱신함)
+    """
+
+    category_hash = hashlib.md5(product.category.name.encode("utf-8")).hexdigest()[:8]
+    return f"mall:card:{product.pk}:{product.updated_at.timestamp()}:{category_hash}"
+
+
+def get_or_render_product_cards(
+    product_list: list[Product], render: Callable[[Product], str]
+) -> list[str]:
+    """
+    상품별 카드 HTML 목록. 캐시에 없는 카드만 렌더링하고, 조회/저장은 한 번에 처리
+    """
+
+    key_list = [get_product_card_key(product) for product in product_list]
+    html_dict = cache.get_many(key_list)
+    product_card_cache.inc("hit", len(html_dict))
+    product_card_cache.inc("miss", len(key_list) - len(html_dict))
+
+    missing_dict = {
+        key: render(product)
+        for key, product in zip(key_list, product_list)
+        if key not in html_dict
+    }
+    if missing_dict:
+        cache.set_many(missing_dict, timeout=settings.MALL_PRODUCT_CARD_CACHE_TIMEOUT)
+        html_dict.update(missing_dict)
+    return [html_dict[key] for key in key_list]
+
+
+def get_or_render_order_detail(order: Order, render: Callable[[], str]) -> str:
+    """
+    배송완료/주문취소 주문은 바뀌지 않으므로 렌더링된 주문 상세 HTML을 잠시 캐싱.
+    그 외 상태는 매번 렌더링
+    """
+
+    if not order.is_finished():
+        return render()
+
+    key = f"mall:order:{order.pk}:{order.status}:{order.updated_at.timestamp()}"
+    html = cache.get(key)
+    if html is None:
+        html = render()
+        cache.set(key, html, timeout=settings.MALL_ORDER_DETAIL_CACHE_TIMEOUT)
+    return html
+
+
+@dataclass(frozen=True)
+class CartSummary:
+    item_count: int = 0
+    total_amount: int = 0
+
+
+def get_cart_summary_key(user_pk: int) -> str:
+    # 상품 가격이 바뀌면 상품 목록 버전이 바뀌므로, 합계도 함께 무효화됨
+    return f"mall:cart:{get_catalog_version()}:{user_pk}"
+
+
+def get_cart_summary(user_pk: int) -> CartSummary:
+    """
+    사용자 장바구니의 상품 수와 합계. 캐시에 없을 때만 DB에서 집계
+    """
+
+    key = get_cart_summary_key(user_pk)
+    summary = cache.get(key)
+    if summary is None:
+        summary = CartSummary(
+            **CartProduct.objects.filter(user_id=user_pk).aggregate(
+                item_count=Count("pk"),
+                total_amount=Sum(F("product__price") * F("quantity"), default=0),
+            )
+        )
+        set_cart_summary(user_pk, summary, key=key)
+    return summary
+
+
+def set_cart_summary(user_pk: int, summary: CartSummary, key: Optional[str] = None):
+    cache.set(
+        key or get_cart_summary_key(user_pk),
+        summary,
+        timeout=settings.MALL_CART_SUMMARY_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_cart_summary(user_pk: int):
+    cache.delete(get_cart_summary_key(user_pk))
@@ -0,0 +1,14 @@
+from django.utils.functional import SimpleLazyObject
+
+from mall.cache import get_cart_summary
+
+
+def cart_summary(request):
+    """
+    헤더 등에서 쓰는 장바구니 요약. 템플릿에서 사용할 때만 캐시를 조회
+    """
+
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {"cart_summary": SimpleLazyObject(lambda: get_cart_summary(user.pk))}
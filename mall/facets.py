@@ -0,0 +1,210 @@
+"""
+상품 목록의 카테고리/가격대 필터와 facet 수.
+
+facet 수는 ProductFacet 테이블에 미리 집계해두고, 상품 저장/삭제 시그널에서
+바뀐 (카테고리, 가격대) 행만 증감한다. 시그널이 발생하지 않는 queryset.update(),
+bulk_create/bulk_update 후에는 refresh_facets()로 해당 카테고리를 다시 집계해야 한다.
+(전체 재집계: refresh_product_facets)
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Value, When
+
+from mall.cache import get_catalog_version
+from mall.models import Product, ProductFacet
+
+
+# 가격대 경계 (원). 변경하면 refresh_product_facets 로 다시 집계해야 함
+PRICE_BAND_BOUNDS = (10_000, 30_000, 50_000, 100_000)
+PRICE_BAND_COUNT = len(PRICE_BAND_BOUNDS) + 1
+
+
+def get_price_band(price: int) -> int:
+    return bisect_right(PRICE_BAND_BOUNDS, price)
+
+
+def get_price_band_range(price_band: int) -> tuple[Optional[int], Optional[int]]:
+    """가격대의 (최소 가격, 최대 가격 미만). 경계가 없으면 None"""
+
+    bounds = (None,) + PRICE_BAND_BOUNDS + (None,)
+    return bounds[price_band], bounds[price_band + 1]
+
+
+def get_price_band_label(price_band: int) -> str:
+    lower, upper = get_price_band_range(price_band)
+    if lower is None:
+        return f"{upper:,}원 미만"
+    if upper is None:
+        return f"{lower:,}원 이상"
+    return f"{lower:,}원 ~ {upper:,}원"
+
+
+def get_price_band_expression() -> Case:
+    return Case(
+        *[
+            When(price__lt=bound, then=Value(price_band))
+            for price_band, bound in enumerate(PRICE_BAND_BOUNDS)
+        ],
+        default=Value(len(PRICE_BAND_BOUNDS)),
+        output_field=IntegerField(),
+    )
+
+
+def filter_products(
+    queryset, category_pk: Optional[int] = None, price_band: Optional[int] = None
+):
+    if category_pk is not None:
+        queryset = queryset.filter(category_id=category_pk)
+    if price_band is not None:
+        lower, upper = get_price_band_range(price_band)
+        if lower is not None:
+            queryset = queryset.filter(price__gte=lower)
+        if upper is not None:
+            queryset = queryset.filter(price__lt=upper)
+    return queryset
+
+
+# 집계 갱신
+
+
+def get_facet_key(status: str, category_pk: int, price: int) -> Optional[tuple]:
+    if status != Product.Status.ACTIVE:
+        return None
+    return category_pk, get_price_band(price)
+
+
+def refresh_facets(category_pk_list: Optional[Iterable[int]] = None):
+    """
+    상품 테이블에서 다시 집계. category_pk_list를 지정하면 해당 카테고리만 집계
+    """
+
+    product_qs = Product.objects.filter(status=Product.Status.ACTIVE)
+    facet_qs = ProductFacet.objects.all()
+    if category_pk_list is not None:
+        category_pk_list = list(category_pk_list)
+        if not category_pk_list:
+            return
+        product_qs = product_qs.filter(category_id__in=category_pk_list)
+        facet_qs = facet_qs.filter(category_id__in=category_pk_list)
+
+    count_list = (
+        product_qs.annotate(price_band=get_price_band_expression())
+        .values("category_id", "price_band")
+        .annotate(product_count=Count("pk"))
+        .order_by()
+    )
+
+    with transaction.atomic():
+        facet_qs.delete()
+        ProductFacet.objects.bulk_create(
+            [ProductFacet(**values) for values in count_list]
+        )
+
+
+def _add_facet_count(facet_key: tuple, delta: int) -> bool:
+    category_pk, price_band = facet_key
+    facet_qs = ProductFacet.objects.filter(
+        category_id=category_pk, price_band=price_band
+    )
+    if delta < 0:
+        facet_qs = facet_qs.filter(product_count__gte=-delta)
+    return facet_qs.update(product_count=F("product_count") + delta) > 0
+
+
+def update_product_facet(product: Product, created: bool = False):
+    """상품 저장 후, 이전/현재 (카테고리, 가격대)의 상품 수를 증감"""
+
+    new_key = get_facet_key(product.status, product.category_id, product.price)
+    if created:
+        old_key = None
+    elif product._loaded_facet_values is not None:
+        old_key = get_facet_key(*product._loaded_facet_values)
+    else:
+        # 이전 값을 알 수 없으면 (only()/defer() 등) 전체를 다시 집계
+        refresh_facets()
+        return
+
+    if old_key != new_key:
+        with transaction.atomic():
+            if old_key is not None and not _add_facet_count(old_key, -1):
+                refresh_facets([old_key[0]])
+            if new_key is not None and not _add_facet_count(new_key, 1):
+                # 아직 집계 행이 없는 (카테고리, 가격대)
+                refresh_facets([new_key[0]])
+
+    product._loaded_facet_values = (product.status, product.category_id, product.price)
+
+
+def remove_product_facet(product: Product):
+    values = product._loaded_facet_values or (
+        product.status,
+        product.category_id,
+        product.price,
+    )
+    old_key = get_facet_key(*values)
+    if old_key is not None and not _add_facet_count(old_key, -1):
+        refresh_facets([old_key[0]])
+
+
+# 조회
+
+
+@dataclass(frozen=True)
+class FacetItem:
+    value: int
+    label: str
+    count: int
+    selected: bool
+
+
+def get_facet_rows() -> list[tuple[int, str, int, int]]:
+    """
+    (category_pk, category_name, price_band, product_count) 목록.
+    상품/카테고리가 바뀌면 상품 목록 버전이 바뀌므로, 같은 버전 동안 캐싱
+    """
+
+    key = f"mall:facets:{get_catalog_version()}"
+    row_list = cache.get(key)
+    if row_list is None:
+        row_list = list(
+            ProductFacet.objects.filter(product_count__gt=0)
+            .order_by("category__name", "price_band")
+            .values_list("category_id", "category__name", "price_band", "product_count")
+        )
+        cache.set(key, row_list, timeout=settings.MALL_CATALOG_CACHE_TIMEOUT)
+    return row_list
+
+
+def get_catalog_facets(
+    category_pk: Optional[int] = None, price_band: Optional[int] = None
+) -> tuple[list[FacetItem], list[FacetItem]]:
+    """
+    (카테고리 facet 목록, 가격대 facet 목록).
+    카테고리별 수는 선택한 가격대 안에서, 가격대별 수는 선택한 카테고리 안에서 센다
+    """
+
+    category_dict = {}
+    price_band_count = [0] * PRICE_BAND_COUNT
+    for row_category_pk, category_name, row_price_band, count in get_facet_rows():
+        if price_band is None or row_price_band == price_band:
+            name, total = category_dict.get(row_category_pk, (category_name, 0))
+            category_dict[row_category_pk] = (name, total + count)
+        if category_pk is None or row_category_pk == category_pk:
+            price_band_count[row_price_band] += count
+
+    category_facet_list = [
+        FacetItem(pk, name, count, pk == category_pk)
+        for pk, (name, count) in category_dict.items()
+    ]
+    price_band_facet_list = [
+        FacetItem(band, get_price_band_label(band), count, band == price_band)
+        for band, count in enumerate(price_band_count)
+        if count or band == price_band
+    ]
+    return category_facet_list, price_band_facet_list
@@ -1,4 +1,7 @@
 from django import forms
+from django.db import transaction
+from django.forms import BaseModelFormSet, modelformset_factory
+
 from .models import CartProduct
 
 
@@ -6,3 +9,92 @@ class CartProductForm(forms.ModelForm):
     class Meta:
         model = CartProduct
         fields = ["quantity"]
+
+
+class ExistingObjectChoiceField(forms.ModelChoiceField):
+    """
+    formset의 queryset에서 이미 조회한 객체 중에서 찾는 pk 필드.
+    ModelChoiceField는 폼마다 queryset.get()으로 다시 조회하므로 대체해서 사용
+    """
+
+    def __init__(self, object_dict: dict, *args, **kwargs):
+        self.object_dict = object_dict
+        super().__init__(*args, **kwargs)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            obj = self.object_dict.get(self.queryset.model._meta.pk.to_python(value))
+        except forms.ValidationError:
+            obj = None
+        if obj is None:
+            raise forms.ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
+        return obj
+
+
+class BaseCartProductFormSet(BaseModelFormSet):
+    """
+    장바구니 수정 formset.
+    수량 변경은 bulk_update 1회, 삭제는 DELETE 1회로 한 트랜잭션에서 저장한다.
+    장바구니에 새 상품을 추가하지는 않는다.
+    """
+
+    def get_object_dict(self) -> dict:
+        if not hasattr(self, "_cart_product_dict"):
+            self._cart_product_dict = {
+                cart_product.pk: cart_product for cart_product in self.get_queryset()
+            }
+        return self._cart_product_dict
+
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        pk_name = self.model._meta.pk.name
+        field = form.fields[pk_name]
+        form.fields[pk_name] = ExistingObjectChoiceField(
+            self.get_object_dict(),
+            field.queryset,
+            initial=field.initial,
+            required=False,
+            widget=field.widget,
+        )
+
+    def save(self, commit=True):
+        deleted_form_set = set(self.deleted_forms)
+        self.deleted_objects = [
+            form.instance for form in deleted_form_set if form.instance.pk is not None
+        ]
+        self.changed_objects = [
+            (form.instance, form.changed_data)
+            for form in self.initial_forms
+            if form not in deleted_form_set and form.has_changed()
+        ]
+        self.new_objects = []
+
+        if commit:
+            with transaction.atomic():
+                CartProduct.objects.bulk_update(
+                    [cart_product for cart_product, _ in self.changed_objects],
+                    ["quantity"],
+                )
+                if self.deleted_objects:
+                    CartProduct.objects.filter(
+                        pk__in=[
+                            cart_product.pk for cart_product in self.deleted_objects
+                        ]
+                    ).delete()
+
+        return [cart_product for cart_product, _ in self.changed_objects]
+
+
+CartProductFormSet = modelformset_factory(
+    model=CartProduct,
+    form=CartProductForm,
+    formset=BaseCartProductFormSet,
+    can_delete=True,
+    extra=0,
+)
@@ -0,0 +1,563 @@
+import gzip
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, TextIO
+
+import requests
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.utils import timezone
+from urllib3.util.retry import Retry
+
+from mall.cache import invalidate_catalog
+from mall.facets import refresh_facets
+from mall.models import Category, Product
+from mall.search import index_products
+from mall.thumbnails import schedule_thumbnail
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Item:
+    category_name: str
+    name: str
+    price: int
+    priceUnit: str
+    desc: str
+    photo_path: str
+
+    @property
+    def content_hash(self) -> str:
+        data = json.dumps(asdict(self), sort_keys=True, ensure_ascii=False)
+        return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass
+class ImportStats:
+    started_at: float = field(default_factory=time.monotonic)
+    item_count: int = 0
+    skipped_count: int = 0
+    created_count: int = 0
+    updated_count: int = 0
+    photo_count: int = 0
+    photo_failed_count: int = 0
+    resumed_offset: int = 0
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def items_per_second(self) -> float:
+        return self.item_count / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        resumed = (
+            f"resumed after {self.resumed_offset} items, "
+            if self.resumed_offset
+            else ""
+        )
+        return resumed + (
+            f"{self.item_count} items in {self.elapsed:.1f}s "
+            f"({self.items_per_second:.1f} items/s): "
+            f"{self.skipped_count} unchanged, {self.created_count} created, "
+            f"{self.updated_count} updated, {self.photo_count} photos, "
+            f"{self.photo_failed_count} photo failures"
+        )
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def iter_json_array(fp: TextIO, chunk_size: int = 64 * 1024) -> Iterator[dict]:
+    """
+    JSON 배열을 전부 메모리에 올리지 않고, 원소를 하나씩 읽어서 반환
+    """
+
+    decoder = json.JSONDecoder()
+    buffer = ""
+    is_eof = False
+    is_started = False
+    # 원소 다음에는 "," 또는 "]"만 올 수 있음
+    expect_separator = False
+    # "[" 바로 다음 (빈 배열)에만 원소 대신 "]"가 올 수 있음
+    is_first = True
+
+    while True:
+        buffer = buffer.lstrip()
+
+        if buffer:
+            if not is_started:
+                if not buffer.startswith("["):
+                    raise ValueError("JSON array expected")
+                buffer = buffer[1:]
+                is_started = True
+                continue
+
+            if expect_separator or is_first:
+                if buffer.startswith("]"):
+                    return
+            if expect_separator:
+                if not buffer.startswith(","):
+                    raise ValueError(f"',' or ']' expected: {buffer[:20]!r}")
+                buffer = buffer[1:]
+                expect_separator = False
+                continue
+
+            try:
+                obj, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError as e:
+                if is_eof:
+                    raise ValueError(f"invalid JSON array element: {e}") from e
+                # 원소가 읽어둔 버퍼 경계에서 잘린 경우, 더 읽어서 다시 시도
+            else:
+                # 버퍼 끝까지 읽은 숫자 등은 다음 청크에서 이어질 수 있음
+                if end < len(buffer) or is_eof:
+                    yield obj
+                    buffer = buffer[end:]
+                    expect_separator = True
+                    is_first = False
+                    continue
+
+        if is_eof:
+            raise ValueError("unexpected end of JSON array")
+        chunk = fp.read(chunk_size)
+        if chunk:
+            buffer += chunk
+        else:
+            is_eof = True
+
+
+def iter_json_lines(fp: TextIO) -> Iterator[dict]:
+    for line in fp:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def iter_item_dicts(fp: TextIO) -> Iterator[dict]:
+    # 첫 글자로 JSON 배열과 JSON Lines 형식을 구분
+    first_char = ""
+    while not first_char:
+        first_char = fp.read(1)
+        if not first_char:
+            return
+        first_char = first_char.strip()
+
+    if first_char == "[":
+        yield from iter_json_array(_PrefixedReader("[", fp))
+    else:
+        yield from iter_json_lines(_PrefixedReader(first_char, fp))
+
+
+class _PrefixedReader:
+    """이미 읽은 prefix를 앞에 되돌려 놓은 TextIO"""
+
+    def __init__(self, prefix: str, fp: TextIO):
+        self.prefix = prefix
+        self.fp = fp
+
+    def read(self, size: int = -1) -> str:
+        prefix, self.prefix = self.prefix, ""
+        return prefix + self.fp.read(size)
+
+    def __iter__(self):
+        if self.prefix:
+            yield self.prefix + self.fp.readline()
+            self.prefix = ""
+        yield from self.fp
+
+
+SOURCE_SUFFIXES = (".json", ".jsonl", ".json.gz", ".jsonl.gz")
+
+
+def get_source_files(source: Path) -> list[Path]:
+    if source.is_dir():
+        return sorted(
+            path
+            for path in source.iterdir()
+            if path.is_file() and path.name.endswith(SOURCE_SUFFIXES)
+        )
+    return [source]
+
+
+def get_source_id(source: Path) -> str:
+    # 파일이 바뀌면 중단된 위치를 무시하고 처음부터 (해시 비교로) 다시 확인
+    return ";".join(
+        f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+        for path in get_source_files(source)
+        for stat in [path.stat()]
+    )
+
+
+def iter_items_from_path(source: Path) -> Iterator[Item]:
+    """
+    로컬 파일(또는 디렉토리 내의 파일들)에서 Item을 하나씩 읽어서 반환.
+    JSON 배열과 JSON Lines를 지원하고, .gz 파일은 압축을 풀면서 읽는다.
+    """
+
+    for path in get_source_files(source):
+        if path.suffix == ".gz":
+            fp = gzip.open(path, "rt", encoding="utf-8")
+        else:
+            fp = path.open("rt", encoding="utf-8")
+        with fp:
+            for item_dict in iter_item_dicts(fp):
+                yield Item(**item_dict)
+
+
+def get_database_id() -> str:
+    settings_dict = connection.settings_dict
+    return ":".join(
+        [
+            connection.vendor,
+            str(settings_dict.get("HOST") or ""),
+            str(settings_dict.get("PORT") or ""),
+            str(settings_dict["NAME"]),
+        ]
+    )
+
+
+class ImportCheckpoint:
+    """
+    load_products 진행상황을 기록하는 SQLite 파일.
+    - 소스별 마지막 처리 위치(offset): 중단된 실행을 이어서 진행
+    - 상품별 내용 해시: 다시 실행할 때 변경되지 않은 상품은 DB 조회 없이 건너뜀
+
+    기록은 database_id의 DB에 반영한 내용이므로, 다른 DB로 실행하면 기록을 비우고 시작
+    """
+
+    def __init__(self, path: Path, database_id: str):
+        self.db = sqlite3.connect(path)
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS item (
+                key TEXT PRIMARY KEY,
+                hash TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS source (
+                source_id TEXT PRIMARY KEY,
+                "offset" INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                name TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            """
+        )
+
+        row = self.db.execute(
+            "SELECT value FROM meta WHERE name = 'database_id'"
+        ).fetchone()
+        if row is None or row[0] != database_id:
+            with self.db:
+                self.db.execute("DELETE FROM item")
+                self.db.execute("DELETE FROM source")
+                self.db.execute(
+                    "INSERT OR REPLACE INTO meta (name, value) "
+                    "VALUES ('database_id', ?)",
+                    [database_id],
+                )
+
+    def get_offset(self, source_id: str) -> int:
+        row = self.db.execute(
+            'SELECT "offset" FROM source WHERE source_id = ?', [source_id]
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_hashes(self, key_list: list[str]) -> dict[str, str]:
+        if not key_list:
+            return {}
+        placeholders = ", ".join(["?"] * len(key_list))
+        return dict(
+            self.db.execute(
+                f"SELECT key, hash FROM item WHERE key IN ({placeholders})", key_list
+            )
+        )
+
+    def save(self, source_id: str, offset: int, hash_dict: dict[str, str]):
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO item (key, hash) VALUES (?, ?)",
+                hash_dict.items(),
+            )
+            self.db.execute(
+                'INSERT OR REPLACE INTO source (source_id, "offset") VALUES (?, ?)',
+                [source_id, offset],
+            )
+
+    def finish(self, source_id: str):
+        # 끝까지 처리한 소스는 다음 실행 때 처음부터 (해시 비교로) 확인
+        with self.db:
+            self.db.execute("DELETE FROM source WHERE source_id = ?", [source_id])
+
+    def close(self):
+        self.db.close()
+
+
+class ProductImporter:
+    """
+    Item 목록을 batch_size 단위로 나눠서 상품으로 등록.
+    배치마다 새 상품은 bulk_create, 가격/설명이 바뀐 상품은 bulk_update로 한 번에
+    반영하고, 사진은 커넥션 풀을 공유하는 스레드 workers개로 동시에 내려받는다.
+    Item은 iterator로 받아서 배치 단위로만 메모리에 올린다.
+
+    photo_base: 사진 경로(Item.photo_path)의 기준 URL 또는 로컬 디렉토리
+    checkpoint: 지정하면 변경되지 않은 상품은 건너뛰고, 중단된 위치부터 이어서 진행
+    """
+
+    def __init__(
+        self,
+        photo_base: str,
+        workers: int = 8,
+        batch_size: int = 500,
+        retries: int = 3,
+        checkpoint: Optional[ImportCheckpoint] = None,
+        on_progress=None,
+    ):
+        self.photo_base = photo_base
+        self.workers = workers
+        self.batch_size = batch_size
+        self.checkpoint = checkpoint
+        self.on_progress = on_progress
+        self.stats = ImportStats()
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+        )
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=workers, max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.category_dict: dict[str, Category] = {}
+
+    def run(self, item_list: Iterable[Item], source_id: str = "") -> ImportStats:
+        self.category_dict = {
+            category.name: category for category in Category.objects.all()
+        }
+
+        offset = 0
+        if self.checkpoint is not None:
+            offset = self.checkpoint.get_offset(source_id)
+        if offset:
+            # 이전 실행이 중단된 위치부터 이어서 진행
+            item_list = islice(item_list, offset, None)
+            self.stats.resumed_offset = offset
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for item_batch in chunked(item_list, self.batch_size):
+                hash_dict = self.import_batch(item_batch, executor)
+                offset += len(item_batch)
+                if self.checkpoint is not None:
+                    self.checkpoint.save(source_id, offset, hash_dict)
+                if self.on_progress is not None:
+                    self.on_progress(self.stats)
+
+        if self.checkpoint is not None:
+            self.checkpoint.finish(source_id)
+        invalidate_catalog()
+        return self.stats
+
+    def get_category_name(self, item: Item) -> str:
+        return item.category_name or "undefined"
+
+    def get_key(self, item: Item) -> str:
+        return f"{self.get_category_name(item)}\x1f{item.name}"
+
+    def get_product_key(self, product: Product) -> str:
+        return f"{product.category.name}\x1f{product.name}"
+
+    def ensure_categories(self, item_list: Iterable[Item]):
+        name_set = {self.get_category_name(item) for item in item_list}
+        new_name_set = name_set - self.category_dict.keys()
+        if not new_name_set:
+            return
+
+        Category.objects.bulk_create(
+            [Category(name=name) for name in new_name_set], ignore_conflicts=True
+        )
+        for category in Category.objects.filter(name__in=new_name_set):
+            self.category_dict[category.name] = category
+
+    def get_existing_products(self, item_dict: dict[str, Item]) -> dict[str, Product]:
+        # 배치에 속한 상품 중 이미 등록된 상품을 한 번에 조회
+        product_qs = Product.objects.filter(
+            category__name__in={
+                self.get_category_name(item) for item in item_dict.values()
+            },
+            name__in={item.name for item in item_dict.values()},
+        ).select_related("category")
+
+        product_dict = {}
+        for product in product_qs:
+            key = self.get_product_key(product)
+            if key in item_dict:
+                product_dict.setdefault(key, product)
+        return product_dict
+
+    def import_batch(
+        self, item_list: list[Item], executor: ThreadPoolExecutor
+    ) -> dict[str, str]:
+        """
+        배치를 반영하고, 반영을 마친 상품의 {key: 내용 해시}를 반환.
+        사진을 받지 못한 상품은 제외해서 다음 실행 때 사진을 다시 받도록 함
+        """
+
+        self.stats.item_count += len(item_list)
+
+        # 같은 배치 안의 중복 상품은 처음 것만 반영
+        item_dict: dict[str, Item] = {}
+        for item in item_list:
+            item_dict.setdefault(self.get_key(item), item)
+
+        if self.checkpoint is not None:
+            saved_hash_dict = self.checkpoint.get_hashes(list(item_dict))
+            item_dict = {
+                key: item
+                for key, item in item_dict.items()
+                if saved_hash_dict.get(key) != item.content_hash
+            }
+        self.stats.skipped_count += len(item_list) - len(item_dict)
+        if not item_dict:
+            return {}
+
+        self.ensure_categories(item_dict.values())
+        product_dict = self.get_existing_products(item_dict)
+
+        updated_product_list = []
+        photo_product_list = []
+        for key, product in product_dict.items():
+            item = item_dict[key]
+            if product.price != item.price or product.description != item.desc:
+                product.price = item.price
+                product.description = item.desc
+                updated_product_list.append(product)
+            if not product.photo:
+                photo_product_list.append(product)
+
+        new_key_list = [key for key in item_dict if key not in product_dict]
+        new_product_list = list(
+            executor.map(self.build_product, [item_dict[key] for key in new_key_list])
+        )
+        # 사진이 없는 기존 상품만 사진을 다시 받음
+        photo_retry_count = len(photo_product_list)
+        photo_product_list = [
+            product
+            for product, is_saved in zip(
+                photo_product_list,
+                executor.map(
+                    self.save_photo,
+                    photo_product_list,
+                    [
+                        item_dict[self.get_product_key(product)]
+                        for product in photo_product_list
+                    ],
+                ),
+            )
+            if is_saved
+        ]
+        product_dict.update(zip(new_key_list, new_product_list))
+
+        now = timezone.now()
+        changed_product_list = list(
+            {
+                product.pk: product
+                for product in updated_product_list + photo_product_list
+            }.values()
+        )
+        for product in changed_product_list:
+            product.updated_at = now
+
+        with transaction.atomic():
+            Product.objects.bulk_create(new_product_list)
+            Product.objects.bulk_update(
+                changed_product_list, ["price", "description", "photo", "updated_at"]
+            )
+            # bulk_create/bulk_update는 시그널이 없으므로 검색 색인도 직접 갱신
+            index_products(
+                product.pk for product in new_product_list + updated_product_list
+            )
+            # 새 상품은 비활성화 상태이므로, 가격이 바뀌었을 수 있는 판매중 상품만 재집계
+            refresh_facets(
+                {
+                    product.category_id
+                    for product in updated_product_list
+                    if product.status == Product.Status.ACTIVE
+                }
+            )
+
+        # bulk_create/bulk_update는 post_save 시그널을 발생시키지 않음
+        for product in new_product_list + photo_product_list:
+            if product.photo:
+                schedule_thumbnail(product.pk)
+
+        new_photo_count = sum(1 for product in new_product_list if product.photo)
+        self.stats.created_count += len(new_product_list)
+        self.stats.updated_count += len(changed_product_list)
+        self.stats.photo_count += new_photo_count + len(photo_product_list)
+        self.stats.photo_failed_count += (
+            len(new_product_list)
+            - new_photo_count
+            + photo_retry_count
+            - len(photo_product_list)
+        )
+
+        return {
+            key: item.content_hash
+            for key, item in item_dict.items()
+            if product_dict[key].photo or not item.photo_path
+        }
+
+    def build_product(self, item: Item) -> Product:
+        product = Product(
+            category=self.category_dict[self.get_category_name(item)],
+            name=item.name,
+            description=item.desc,
+            price=item.price,
+        )
+        self.save_photo(product, item)
+        return product
+
+    def save_photo(self, product: Product, item: Item) -> bool:
+        photo_data = self.fetch_photo(item)
+        if photo_data is None:
+            return False
+
+        filename = item.photo_path.rsplit("/", 1)[-1]
+        product.photo.save(name=filename, content=ContentFile(photo_data), save=False)
+        return True
+
+    def fetch_photo(self, item: Item) -> Optional[bytes]:
+        if not self.photo_base.startswith(("http://", "https://")):
+            photo_path = Path(self.photo_base) / item.photo_path
+            try:
+                return photo_path.read_bytes()
+            except OSError as e:
+                logger.warning(f"photo read failed: {photo_path} ({e})")
+                return None
+
+        photo_url = self.photo_base + item.photo_path
+        try:
+            response = self.session.get(photo_url, timeout=30)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logger.warning(f"photo download failed: {photo_url} ({e})")
+            return None
+        return response.content
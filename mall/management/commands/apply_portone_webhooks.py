@@ -0,0 +1,33 @@
+import time
+
+from django.core.management import BaseCommand
+
+from mall.webhooks import apply_pending_webhooks
+
+
+class Command(BaseCommand):
+    help = "Apply queued PortOne webhooks to order payments in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="keep polling the queue every N seconds (0: run once)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        interval = options["interval"]
+
+        while True:
+            total = 0
+            while count := apply_pending_webhooks(batch_size=batch_size):
+                total += count
+            if total:
+                self.stdout.write(f"applied {total} webhooks")
+
+            if not interval:
+                break
+            time.sleep(interval)
@@ -0,0 +1,43 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management import BaseCommand
+from django.db import connection
+
+from mall.cache import invalidate_catalog
+from mall.models import Product
+from mall.thumbnails import generate_thumbnail
+
+
+class Command(BaseCommand):
+    help = "Generate missing product thumbnails"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="regenerate thumbnails of all products",
+        )
+
+    def handle(self, *args, **options):
+        product_qs = Product.objects.exclude(photo="")
+        if not options["all"]:
+            product_qs = product_qs.filter(thumbnail_url="")
+        product_pk_list = list(product_qs.values_list("pk", flat=True))
+
+        def generate(product_pk):
+            try:
+                return generate_thumbnail(product_pk, invalidate=False)
+            finally:
+                connection.close()
+
+        started_at = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            count = sum(
+                1 for url in executor.map(generate, product_pk_list) if url is not None
+            )
+        invalidate_catalog()
+
+        elapsed = time.monotonic() - started_at
+        self.stdout.write(f"generated {count} thumbnails in {elapsed:.1f}s")
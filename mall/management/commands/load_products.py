@@ -1,60 +1,130 @@
-from dataclasses import dataclass
+import codecs
+import hashlib
+import io
+from pathlib import Path
+from typing import Iterator
 
 import requests
-from django.core.files.base import ContentFile
-from django.core.management import BaseCommand
-from tqdm import tqdm
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
 
-from mall.models import Category, Product
+from mall.importer import (
+    ImportCheckpoint,
+    ImportStats,
+    Item,
+    ProductImporter,
+    get_database_id,
+    get_source_id,
+    iter_item_dicts,
+    iter_items_from_path,
+)
 
 BASE_URL = "https://raw.githubusercontent.com/dp-dev-im/payments/main/mall/data/"
 
 
-@dataclass
-class Item:
-    category_name: str
-    name: str
-    price: int
-    priceUnit: str
-    desc: str
-    photo_path: str
-
-
 class Command(BaseCommand):
     help = "Load product from JSON file"
 
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default=BASE_URL)
+        parser.add_argument(
+            "--source",
+            type=Path,
+            help="local JSON/JSONL file (optionally .gz) or a directory of them; "
+            "photo paths are resolved against its directory",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=8, help="concurrent photo downloads"
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--retries", type=int, default=3, help="retries per photo download"
+        )
+        parser.add_argument(
+            "--checkpoint",
+            type=Path,
+            default=settings.BASE_DIR / "load_products.checkpoint.sqlite3",
+            help="file recording progress and item hashes, to resume and skip "
+            "unchanged items on rerun",
+        )
+        parser.add_argument(
+            "--no-checkpoint",
+            action="store_true",
+            help="ignore the checkpoint and check every item",
+        )
+        parser.add_argument(
+            "--reset-checkpoint",
+            action="store_true",
+            help="delete the checkpoint before importing",
+        )
+
     def handle(self, *args, **options):
-        json_url = BASE_URL + "product-list.json"
-        item_dict_list = requests.get(json_url).json()
-
-        item_list = [Item(**item_dict) for item_dict in item_dict_list]
-        # print(item_list)
-
-        category_name_set = {item.category_name for item in item_list}
-        # print(category_name_set)
-
-        category_dict = {}
-        for category_name in category_name_set:
-            category, __ = Category.objects.get_or_create(
-                name=category_name or "undefined"
-            )
-            category_dict[category.name] = category
-
-        for item in tqdm(item_list):
-            category: Category = category_dict[item.category_name or "undefined"]
-            product, is_created = Product.objects.get_or_create(
-                category=category,
-                name=item.name,
-                defaults={
-                    "description": item.desc,
-                    "price": item.price,
-                },
-            )
-
-            if is_created:
-                photo_url = BASE_URL + item.photo_path
-                filename = photo_url.rsplit("/", 1)[-1]
-                photo_data = requests.get(photo_url).content
-                product.photo.save(
-                    name=filename, content=ContentFile(photo_data), save=True
-                )
+        source: Path = options["source"]
+        if source is None:
+            photo_base = options["base_url"]
+            json_url = photo_base + "product-list.json"
+            source_id, item_list = self.open_remote_items(json_url)
+        elif source.exists():
+            photo_base = str(source if source.is_dir() else source.parent)
+            source_id = get_source_id(source)
+            item_list = iter_items_from_path(source)
+        else:
+            raise CommandError(f"{source} does not exist")
+
+        checkpoint_path: Path = options["checkpoint"]
+        if options["reset_checkpoint"]:
+            checkpoint_path.unlink(missing_ok=True)
+        checkpoint = None
+        if not options["no_checkpoint"]:
+            checkpoint = ImportCheckpoint(checkpoint_path, get_database_id())
+
+        importer = ProductImporter(
+            photo_base=photo_base,
+            workers=options["workers"],
+            batch_size=options["batch_size"],
+            retries=options["retries"],
+            checkpoint=checkpoint,
+            on_progress=self.print_progress,
+        )
+        try:
+            stats = importer.run(item_list, source_id=source_id)
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+
+        self.stdout.write(self.style.SUCCESS(str(stats)))
+
+    def open_remote_items(self, json_url) -> tuple[str, Iterator[Item]]:
+        """
+        (source_id, Item 목록). 원격 파일이 바뀌면 중단된 위치를 이어가지 않도록
+        source_id에 ETag/Last-Modified를, 둘 다 없으면 내용 해시를 포함
+        """
+
+        response = requests.get(json_url, stream=True)
+        try:
+            response.raise_for_status()
+        except requests.HTTPError:
+            response.close()
+            raise
+
+        version = response.headers.get("ETag") or response.headers.get("Last-Modified")
+        if version:
+            return f"{json_url}:{version}", self.iter_response_items(response)
+
+        content = response.content
+        source_id = f"{json_url}:{hashlib.sha256(content).hexdigest()}"
+        fp = io.StringIO(content.decode("utf-8"))
+        return source_id, (Item(**item_dict) for item_dict in iter_item_dicts(fp))
+
+    def iter_response_items(self, response) -> Iterator[Item]:
+        with response:
+            response.raw.decode_content = True
+            # TextIOWrapper는 응답을 끝까지 읽어서 raw가 닫히면 ValueError를 발생시킴
+            fp = codecs.getreader("utf-8")(response.raw)
+            for item_dict in iter_item_dicts(fp):
+                yield Item(**item_dict)
+
+    def print_progress(self, stats: ImportStats):
+        self.stdout.write(
+            f"{stats.item_count} items ({stats.items_per_second:.1f} items/s)"
+        )
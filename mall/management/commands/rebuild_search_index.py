@@ -0,0 +1,23 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from mall.models import Product
+from mall.search import get_search_backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the product search index from the product table"
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        if backend is None:
+            self.stdout.write("search index is not used on this database")
+            return
+
+        with transaction.atomic():
+            rebuild_index()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"indexed {Product.objects.count()} products ({backend})"
+            )
+        )
@@ -0,0 +1,121 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management import BaseCommand
+from django.utils import timezone
+from iamport import Iamport
+from requests import RequestException
+
+from mall.importer import chunked
+from mall.models import OrderPayment
+
+
+logger = logging.getLogger(__name__)
+
+# 포트원에 결제내역이 없음 (결제창을 열지 않고 떠난 결제건)
+NOT_FOUND = object()
+
+
+class RateLimiter:
+    """스레드 간에 공유하는 초당 호출 횟수 제한"""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0
+        self._lock = threading.Lock()
+        self._next_at = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            call_at = max(self._next_at, now)
+            self._next_at = call_at + self.interval
+        time.sleep(call_at - now)
+
+
+class Command(BaseCommand):
+    help = "Reconcile stale ready order payments with PortOne"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--minutes",
+            type=int,
+            default=30,
+            help="only payments still ready after N minutes",
+        )
+        parser.add_argument("--chunk-size", type=int, default=500)
+        parser.add_argument(
+            "--workers", type=int, default=8, help="concurrent PortOne requests"
+        )
+        parser.add_argument(
+            "--rate", type=float, default=20, help="PortOne requests per second"
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(minutes=options["minutes"])
+        chunk_size = options["chunk_size"]
+        rate_limiter = RateLimiter(options["rate"])
+
+        payment_qs = (
+            OrderPayment.objects.filter(
+                pay_status=OrderPayment.PayStatus.READY,
+                created_at__lt=cutoff,
+            )
+            .select_related("order")
+            .order_by("pk")
+        )
+
+        def fetch_meta(payment: OrderPayment):
+            rate_limiter.wait()
+            try:
+                return payment.api.find(merchant_uid=payment.merchant_uid)
+            except Iamport.HttpError as e:
+                if e.code == 404:
+                    return NOT_FOUND
+                logger.warning("failed to fetch %s: %s", payment.merchant_uid, e)
+            except (Iamport.ResponseError, RequestException) as e:
+                # 타임아웃/연결 오류는 실패로 세고 다음 주기에 다시 확인
+                logger.warning("failed to fetch %s: %s", payment.merchant_uid, e)
+            return None
+
+        checked_count = updated_count = not_found_count = failed_count = 0
+        started_at = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            for payment_list in chunked(
+                payment_qs.iterator(chunk_size=chunk_size), chunk_size
+            ):
+                payment_meta_list = []
+                not_found_pk_list = []
+                for payment, meta in zip(
+                    payment_list, executor.map(fetch_meta, payment_list)
+                ):
+                    if meta is None:
+                        failed_count += 1
+                    elif meta is NOT_FOUND:
+                        not_found_pk_list.append(payment.pk)
+                    elif meta["status"] != payment.pay_status:
+                        payment_meta_list.append((payment, meta))
+
+                OrderPayment.bulk_update_by_meta(payment_meta_list)
+                # cutoff이 지나도록 포트원에 없는 결제건은 실패로 처리해서 다시 조회하지 않음.
+                # 주문은 다른 결제건으로 결제했을 수 있으므로 주문 상태는 바꾸지 않음
+                OrderPayment.objects.filter(pk__in=not_found_pk_list).update(
+                    pay_status=OrderPayment.PayStatus.FAILED,
+                    updated_at=timezone.now(),
+                )
+                checked_count += len(payment_list)
+                updated_count += len(payment_meta_list)
+                not_found_count += len(not_found_pk_list)
+
+        elapsed = time.monotonic() - started_at
+        self.stdout.write(
+            f"checked {checked_count} payments in {elapsed:.1f}s "
+            f"({checked_count / elapsed if elapsed else 0:.1f}/s): "
+            f"{updated_count} updated, {not_found_count} not found (marked failed), "
+            f"{failed_count} failed"
+        )
@@ -0,0 +1,16 @@
+from django.core.management import BaseCommand
+
+from mall.cache import invalidate_catalog
+from mall.facets import refresh_facets
+from mall.models import ProductFacet
+
+
+class Command(BaseCommand):
+    help = "Recount category/price band facets of active products"
+
+    def handle(self, *args, **options):
+        refresh_facets()
+        invalidate_catalog()
+        self.stdout.write(
+            self.style.SUCCESS(f"refreshed {ProductFacet.objects.count()} facets")
+        )
@@ -0,0 +1,54 @@
+from django.core.management import BaseCommand
+
+from mall.portone_simulator import PortoneSimulator, SimulatorConfig
+
+
+class Command(BaseCommand):
+    help = "Run a local PortOne API simulator (set PORTONE_API_URL to its address)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8101)
+        parser.add_argument("--latency-ms", type=float, default=0)
+        parser.add_argument("--jitter-ms", type=float, default=0)
+        parser.add_argument(
+            "--error-rate", type=float, default=0, help="fraction of 5xx responses"
+        )
+        parser.add_argument("--error-status", type=int, default=503)
+        parser.add_argument(
+            "--stall-rate",
+            type=float,
+            default=0,
+            help="fraction of responses delayed by --stall-seconds",
+        )
+        parser.add_argument("--stall-seconds", type=float, default=30)
+        parser.add_argument("--token-ttl", type=int, default=30 * 60)
+        parser.add_argument(
+            "--statuses",
+            default="paid",
+            help="comma separated statuses returned by successive finds "
+            "of a registered payment, e.g. ready,paid",
+        )
+
+    def handle(self, *args, **options):
+        config = SimulatorConfig(
+            latency=options["latency_ms"] / 1000,
+            jitter=options["jitter_ms"] / 1000,
+            error_rate=options["error_rate"],
+            error_status=options["error_status"],
+            stall_rate=options["stall_rate"],
+            stall_seconds=options["stall_seconds"],
+            token_ttl=options["token_ttl"],
+            default_statuses=options["statuses"].split(","),
+        )
+        simulator = PortoneSimulator(config)
+        server = simulator.make_server(options["host"], options["port"])
+        self.stdout.write(
+            f"PortOne simulator on http://{options['host']}:{options['port']}/"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mall", "0005_orderpayment"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PortoneWebhook",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "imp_uid",
+                    models.CharField(
+                        blank=True, max_length=100, verbose_name="포트원 거래고유번호"
+                    ),
+                ),
+                ("merchant_uid", models.UUIDField(verbose_name="결제식별자")),
+                ("status", models.CharField(max_length=12, verbose_name="결제상태")),
+                ("payload", models.JSONField(default=dict, verbose_name="웹훅 내용")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "processed_at",
+                    models.DateTimeField(blank=True, db_index=True, null=True),
+                ),
+            ],
+            options={
+                "verbose_name": "portone webhook",
+                "verbose_name_plural": "portone webhook",
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:34
+
+from django.db import migrations, models
+import django.utils.timezone
+
+from mall.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # PostgreSQL의 CREATE INDEX CONCURRENTLY는 트랜잭션 안에서 실행할 수 없음
+    atomic = False
+
+    dependencies = [
+        ("mall", "0006_portonewebhook"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="orderpayment",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="orderpayment",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        AddIndexConcurrently(
+            model_name="orderpayment",
+            index=models.Index(
+                fields=["pay_status", "created_at"], name="mall_orderpayment_stale_idx"
+            ),
+        ),
+    ]
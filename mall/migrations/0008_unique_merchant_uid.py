@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:35
+
+from django.db import migrations, models
+import uuid
+
+from mall.operations import AlterFieldUniqueConcurrently
+
+
+class Migration(migrations.Migration):
+    # PostgreSQL의 CREATE INDEX CONCURRENTLY는 트랜잭션 안에서 실행할 수 없음
+    atomic = False
+
+    dependencies = [
+        ("mall", "0007_orderpayment_created_at"),
+    ]
+
+    operations = [
+        AlterFieldUniqueConcurrently(
+            model_name="orderpayment",
+            name="uid",
+            field=models.UUIDField(
+                default=uuid.uuid4, editable=False, unique=True, verbose_name="결제식별자"
+            ),
+        ),
+    ]
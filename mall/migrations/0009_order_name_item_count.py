@@ -0,0 +1,60 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:35
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+
+
+def backfill_order_name(apps, schema_editor):
+    Order = apps.get_model("mall", "Order")
+    OrderedProduct = apps.get_model("mall", "OrderedProduct")
+
+    first_product_name_qs = (
+        OrderedProduct.objects.filter(order=OuterRef("pk"))
+        .order_by("pk")
+        .values("name")[:1]
+    )
+    order_qs = Order.objects.annotate(
+        size=Count("orderedproduct"),
+        first_product_name=Subquery(first_product_name_qs),
+    ).only("pk")
+
+    order_list = []
+    for order in order_qs.iterator(chunk_size=1000):
+        # Order.make_name()과 같은 규칙
+        if order.first_product_name is None:
+            order.name = "등록된 상품이 없습니다."
+        elif order.size < 2:
+            order.name = order.first_product_name
+        else:
+            order.name = f"{order.first_product_name} 외 {order.size - 1}건"
+        order.item_count = order.size
+        order_list.append(order)
+
+        if len(order_list) >= 1000:
+            Order.objects.bulk_update(order_list, ["name", "item_count"])
+            order_list = []
+    Order.objects.bulk_update(order_list, ["name", "item_count"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mall", "0008_unique_merchant_uid"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="item_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="주문상품 수"
+            ),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="name",
+            field=models.CharField(
+                blank=True, editable=False, max_length=100, verbose_name="주문명"
+            ),
+        ),
+        migrations.RunPython(backfill_order_name, migrations.RunPython.noop),
+    ]
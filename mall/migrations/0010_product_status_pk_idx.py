@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mall", "0009_order_name_item_count"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["status", "-id"], name="mall_product_status_pk_idx"
+            ),
+        ),
+    ]
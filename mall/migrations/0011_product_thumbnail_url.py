@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mall", "0010_product_status_pk_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="thumbnail_url",
+            field=models.CharField(
+                blank=True, editable=False, max_length=255, verbose_name="썸네일 URL"
+            ),
+        ),
+    ]
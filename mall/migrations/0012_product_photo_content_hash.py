@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:44
+
+from django.db import migrations, models
+import mall.storage
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mall", "0011_product_thumbnail_url"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="product",
+            name="photo",
+            field=models.ImageField(
+                storage=mall.storage.ContentHashStorage(),
+                upload_to="mall/product/photo/",
+            ),
+        ),
+    ]
@@ -0,0 +1,66 @@
+from django.db import migrations
+
+
+POSTGRESQL_FORWARD = [
+    """
+    CREATE TABLE mall_product_search (
+        product_id bigint PRIMARY KEY,
+        document tsvector NOT NULL
+    )
+    """,
+    "CREATE INDEX mall_product_search_document_idx "
+    "ON mall_product_search USING GIN (document)",
+    """
+    INSERT INTO mall_product_search (product_id, document)
+    SELECT
+        p.id,
+        setweight(to_tsvector('simple', p.name), 'A')
+        || setweight(to_tsvector('simple', coalesce(c.name, '')), 'B')
+        || setweight(to_tsvector('simple', p.description), 'C')
+    FROM mall_product p
+    LEFT JOIN mall_category c ON c.id = p.category_id
+    """,
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE mall_product_search USING fts5(
+        name, description, category_name, tokenize = 'unicode61'
+    )
+    """,
+    """
+    INSERT INTO mall_product_search (rowid, name, description, category_name)
+    SELECT p.id, p.name, p.description, coalesce(c.name, '')
+    FROM mall_product p
+    LEFT JOIN mall_category c ON c.id = p.category_id
+    """,
+]
+
+
+def create_search_table(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        sql_list = POSTGRESQL_FORWARD
+    elif vendor == "sqlite":
+        sql_list = SQLITE_FORWARD
+    else:
+        # 그 외 DB는 icontains 검색을 사용
+        return
+
+    for sql in sql_list:
+        schema_editor.execute(sql)
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor in ("postgresql", "sqlite"):
+        schema_editor.execute("DROP TABLE IF EXISTS mall_product_search")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mall", "0012_product_photo_content_hash"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:57
+
+from bisect import bisect_right
+from collections import Counter
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# 마이그레이션 시점의 mall.facets.PRICE_BAND_BOUNDS
+PRICE_BAND_BOUNDS = (10_000, 30_000, 50_000, 100_000)
+
+
+def backfill_product_facet(apps, schema_editor):
+    Product = apps.get_model("mall", "Product")
+    ProductFacet = apps.get_model("mall", "ProductFacet")
+
+    counter = Counter(
+        (category_pk, bisect_right(PRICE_BAND_BOUNDS, price))
+        for category_pk, price in Product.objects.filter(status="a")
+        .values_list("category_id", "price")
+        .iterator(chunk_size=1000)
+    )
+    ProductFacet.objects.bulk_create(
+        [
+            ProductFacet(
+                category_id=category_pk, price_band=price_band, product_count=count
+            )
+            for (category_pk, price_band), count in counter.items()
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mall", "0013_product_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductFacet",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("price_band", models.PositiveSmallIntegerField(verbose_name="가격대")),
+                (
+                    "product_count",
+                    models.PositiveIntegerField(default=0, verbose_name="상품 수"),
+                ),
+            ],
+            options={
+                "verbose_name": "product facet",
+                "verbose_name_plural": "product facet",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["status", "category", "-id"],
+                name="mall_product_category_pk_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="productfacet",
+            name="category",
+            field=models.ForeignKey(
+                db_constraint=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="mall.category",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="productfacet",
+            constraint=models.UniqueConstraint(
+                fields=("category", "price_band"), name="unique_category_and_price_band"
+            ),
+        ),
+        migrations.RunPython(backfill_product_facet, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mall", "0014_product_facet"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["user", "-created_at"], name="mall_order_user_created_idx"
+            ),
+        ),
+    ]
@@ -1,16 +1,19 @@
 import logging
-from functools import cached_property
+from typing import Optional
 from uuid import uuid4
 
-from django.conf import settings
+from asgiref.sync import sync_to_async
 from django.core.validators import MinValueValidator
-from django.db import models
-from django.db.models import UniqueConstraint, QuerySet
+from django.db import models, transaction, connection, IntegrityError
+from django.db.models import UniqueConstraint, QuerySet, F
 from django.http import Http404
 from django.urls import reverse
+from django.utils import timezone
 from iamport import Iamport
 
 from accounts.models import User
+from mall.portone import get_portone_client, get_async_portone_client
+from mall.storage import photo_storage
 
 
 logger = logging.getLogger(__name__)
@@ -49,16 +52,83 @@ class Product(models.Model):
         choices=Status.choices,
         default=Status.INACTIVE,
     )
-    photo = models.ImageField(upload_to="mall/product/photo/%Y/%m/%d/")
+    # 같은 이미지는 하나의 파일을 공유하도록 내용 해시로 저장
+    photo = models.ImageField(upload_to="mall/product/photo/", storage=photo_storage)
+    # 상품 목록에서 이미지 처리 없이 바로 쓰도록 미리 생성해둔 썸네일 주소
+    thumbnail_url = models.CharField(
+        "썸네일 URL", max_length=255, blank=True, editable=False
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # DB에서 읽어온 시점의 photo 경로 (photo 변경 여부 판단용)
+    _loaded_photo_name = None
+    # DB에서 읽어온 시점의 (status, category_id, price) (facet 집계 갱신용)
+    _loaded_facet_values = None
+
     def __str__(self):
         return f"<{self.pk}> {self.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "photo" in field_names:
+            instance._loaded_photo_name = values[field_names.index("photo")]
+        if {"status", "category_id", "price"}.issubset(field_names):
+            instance._loaded_facet_values = tuple(
+                values[field_names.index(name)]
+                for name in ("status", "category_id", "price")
+            )
+        return instance
+
+    @property
+    def photo_changed(self) -> bool:
+        return self.photo.name != self._loaded_photo_name
+
+    @property
+    def photo_hash(self) -> Optional[str]:
+        """사진 내용의 sha256 (썸네일/CDN 캐시 키용)"""
+        return photo_storage.get_hash_from_name(self.photo.name)
+
     class Meta:
         verbose_name = verbose_name_plural = "product"
         ordering = ["-pk"]
+        indexes = [
+            # 상품 목록 keyset 페이지네이션용
+            models.Index(fields=["status", "-id"], name="mall_product_status_pk_idx"),
+            # 카테고리 필터 + keyset 페이지네이션용
+            models.Index(
+                fields=["status", "category", "-id"],
+                name="mall_product_category_pk_idx",
+            ),
+        ]
+
+
+class ProductFacet(models.Model):
+    """
+    판매중(ACTIVE) 상품의 카테고리/가격대별 상품 수 집계.
+    상품 목록 필터의 facet 수를 매번 GROUP BY 하지 않도록 미리 집계해둔다. (mall.facets)
+    """
+
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        db_constraint=False,
+    )
+    price_band = models.PositiveSmallIntegerField("가격대")
+    product_count = models.PositiveIntegerField("상품 수", default=0)
+
+    def __str__(self):
+        return f"{self.category_id}/{self.price_band}: {self.product_count}"
+
+    class Meta:
+        verbose_name = verbose_name_plural = "product facet"
+        constraints = [
+            UniqueConstraint(
+                fields=["category", "price_band"],
+                name="unique_category_and_price_band",
+            )
+        ]
 
 
 class CartProduct(models.Model):
@@ -85,6 +155,75 @@ class CartProduct(models.Model):
     def amount(self) -> int:
         return self.product.price * self.quantity
 
+    @classmethod
+    def add(cls, user: User, quantity_dict: dict[int, int]) -> int:
+        """
+        상품별 수량({product_pk: quantity})만큼 장바구니에 담고, 담긴 상품 수를 반환.
+        판매중(ACTIVE)이 아닌 상품은 건너뜀.
+        """
+
+        if not quantity_dict:
+            return 0
+        if connection.features.supports_update_conflicts_with_target:
+            return cls._add_by_upsert(user, quantity_dict)
+        return cls._add_by_update(user, quantity_dict)
+
+    @classmethod
+    def _add_by_upsert(cls, user: User, quantity_dict: dict[int, int]) -> int:
+        # unique_user_and_product 제약을 이용해, 한 번의 쿼리로 추가/수량 증가
+        qn = connection.ops.quote_name
+        table = qn(cls._meta.db_table)
+        user_column = qn(cls._meta.get_field("user").column)
+        product_column = qn(cls._meta.get_field("product").column)
+        quantity_column = qn(cls._meta.get_field("quantity").column)
+        product_table = qn(Product._meta.db_table)
+        product_pk_column = qn(Product._meta.pk.column)
+        status_column = qn(Product._meta.get_field("status").column)
+
+        when_sql = " ".join(["WHEN %s THEN %s"] * len(quantity_dict))
+        in_sql = ", ".join(["%s"] * len(quantity_dict))
+        sql = (
+            f"INSERT INTO {table} ({user_column}, {product_column}, {quantity_column}) "
+            f"SELECT %s, {product_pk_column}, CASE {product_pk_column} {when_sql} END "
+            f"FROM {product_table} "
+            f"WHERE {product_pk_column} IN ({in_sql}) AND {status_column} = %s "
+            f"ON CONFLICT ({user_column}, {product_column}) "
+            f"DO UPDATE SET {quantity_column} = "
+            f"{table}.{quantity_column} + EXCLUDED.{quantity_column}"
+        )
+        params = [user.pk]
+        for product_pk, quantity in quantity_dict.items():
+            params += [product_pk, quantity]
+        params += list(quantity_dict)
+        params.append(Product.Status.ACTIVE)
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount
+
+    @classmethod
+    def _add_by_update(cls, user: User, quantity_dict: dict[int, int]) -> int:
+        # upsert를 지원하지 않는 DB에서는 F() 표현식으로 수량을 증가
+        product_pk_list = Product.objects.filter(
+            pk__in=quantity_dict, status=Product.Status.ACTIVE
+        ).values_list("pk", flat=True)
+
+        for product_pk in product_pk_list:
+            quantity = quantity_dict[product_pk]
+            cart_product_qs = cls.objects.filter(user=user, product_id=product_pk)
+            if cart_product_qs.update(quantity=F("quantity") + quantity):
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(
+                        user=user, product_id=product_pk, quantity=quantity
+                    )
+            except IntegrityError:
+                # 동시에 같은 상품을 담은 요청이 먼저 생성한 경우
+                cart_product_qs.update(quantity=F("quantity") + quantity)
+
+        return len(product_pk_list)
+
     class Meta:
         verbose_name = verbose_name_plural = "cart product"
         constraints = [
@@ -109,6 +248,8 @@ class Order(models.Model):
         db_constraint=False,
     )
     total_amount = models.PositiveIntegerField("결제금액")
+    name = models.CharField("주문명", max_length=100, blank=True, editable=False)
+    item_count = models.PositiveIntegerField("주문상품 수", default=0, editable=False)
     status = models.CharField(
         "진행상태",
         max_length=18,
@@ -124,52 +265,93 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    def __str__(self):
+        return self.name
+
     def get_absolute_url(self):
         return reverse("order_detail", args=[self.pk])
 
+    def is_finished(self) -> bool:
+        """더 이상 바뀌지 않는 상태인지 여부"""
+        return self.status in (
+            self.StatusChoices.DELIVERED,
+            self.StatusChoices.CANCELED,
+        )
+
     def can_pay(self) -> bool:
         return self.status in (
             self.StatusChoices.REQUESTED,
             self.StatusChoices.FAILED_PAYMENT,
         )
 
-    @property
-    def name(self):
-        first_product = self.orderedproduct_set.first()
-        if first_product is None:
+    @staticmethod
+    def make_name(first_product_name: Optional[str], size: int) -> str:
+        if first_product_name is None:
             return "등록된 상품이 없습니다."
-        size = self.orderedproduct_set.all().count()
         if size < 2:
-            return first_product.name
-        return f"{first_product.name} 외 {size -1}건"
+            return first_product_name
+        return f"{first_product_name} 외 {size -1}건"
 
     @classmethod
     def create_form_cart(
         cls, user: User, cart_product_qs: QuerySet[CartProduct]
     ) -> "Order":
-        # 성능 최적화
-        cart_product_list = list(cart_product_qs)
-
-        total_amount = sum(cart_product.amount for cart_product in cart_product_list)
-        # print(total_amount)
-
-        order = cls.objects.create(user=user, total_amount=total_amount)
-
-        order_product_list = []
-        for cart_product in cart_product_list:
-            product = cart_product.product
-            ordered_product = OrderedProduct(
-                order=order,
-                product=product,
-                name=product.name,
-                price=product.price,
-                quantity=cart_product.quantity,
+        """
+        장바구니 상품으로 주문을 생성하고, 주문한 장바구니 상품은 삭제.
+        장바구니 크기와 무관하게 조회 1회, 주문 생성 1회, 주문상품 생성 1회, 삭제 1회로 처리
+        """
+
+        with transaction.atomic():
+            # 같은 장바구니로 동시에 주문하는 경우를 막기 위해 장바구니 행을 잠금
+            cart_product_list = list(
+                cart_product_qs.select_related("product").select_for_update(
+                    of=("self",)
+                )
+            )
+
+            total_amount = sum(
+                cart_product.amount for cart_product in cart_product_list
             )
-            order_product_list.append(ordered_product)
-        OrderedProduct.objects.bulk_create(order_product_list)
+
+            # 주문명/상품 수는 주문 생성 시점에 한 번만 계산해서 저장
+            order = cls.objects.create(
+                user=user,
+                total_amount=total_amount,
+                name=cls.make_name(
+                    cart_product_list[0].product.name if cart_product_list else None,
+                    len(cart_product_list),
+                ),
+                item_count=len(cart_product_list),
+            )
+
+            order_product_list = []
+            for cart_product in cart_product_list:
+                product = cart_product.product
+                ordered_product = OrderedProduct(
+                    order=order,
+                    product=product,
+                    name=product.name,
+                    price=product.price,
+                    quantity=cart_product.quantity,
+                )
+                order_product_list.append(ordered_product)
+            OrderedProduct.objects.bulk_create(order_product_list)
+
+            # 주문 도중에 새로 담긴 장바구니 상품은 남겨둠
+            CartProduct.objects.filter(
+                pk__in=[cart_product.pk for cart_product in cart_product_list]
+            ).delete()
 
         return order
 
+    class Meta:
+        indexes = [
+            # 사용자별 주문 내역 (최신순)
+            models.Index(
+                fields=["user", "-created_at"], name="mall_order_user_created_idx"
+            ),
+        ]
+
 
 class OrderedProduct(models.Model):
     order = models.ForeignKey(
@@ -195,6 +377,11 @@ class OrderedProduct(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
 
+class PortonePaymentQuerySet(QuerySet):
+    def filter_by_merchant_uids(self, merchant_uid_list):
+        return self.filter(uid__in=merchant_uid_list)
+
+
 class AbstractPortonePayment(models.Model):
     class PayMethod(models.TextChoices):
         CARD = "card", "신용카드"
@@ -206,7 +393,7 @@ class AbstractPortonePayment(models.Model):
         FAILED = "failed", "결제실패"
 
     meta = models.JSONField("포트원 결제내역", default=dict, editable=False)
-    uid = models.UUIDField("결제식별자", default=uuid4, editable=False)
+    uid = models.UUIDField("결제식별자", default=uuid4, editable=False, unique=True)
     name = models.CharField("결제명", max_length=150)
     desired_amount = models.PositiveIntegerField("결제금액", editable=False)
     buyer_name = models.CharField("구매자 이름", max_length=50, editable=False)
@@ -229,47 +416,120 @@ class AbstractPortonePayment(models.Model):
         db_index=True,
         editable=False,
     )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = PortonePaymentQuerySet.as_manager()
 
-    @cached_property
+    @property
     def api(self):
-        return Iamport(
-            imp_key=settings.PORTONE_API_KEY, imp_secret=settings.PORTONE_API_SECRET
-        )
+        return get_portone_client()
 
     @property
     def merchant_uid(self):
         return str(self.uid)
 
-    def update(self):
+    def fetch_meta(self) -> dict:
+        try:
+            return self.api.find(merchant_uid=self.merchant_uid)
+        except (Iamport.ResponseError, Iamport.HttpError) as e:
+            logger.error(str(e), exc_info=e)
+            raise Http404("포트원에서 결제내역을 찾을 수 없음")
+
+    async def afetch_meta(self) -> dict:
         try:
-            self.meta = self.api.find(merchant_uid=self.merchant_uid)
+            return await get_async_portone_client().find(merchant_uid=self.merchant_uid)
         except (Iamport.ResponseError, Iamport.HttpError) as e:
             logger.error(str(e), exc_info=e)
             raise Http404("포트원에서 결제내역을 찾을 수 없음")
 
+    def apply_meta(self, meta: dict):
+        self.meta = meta
         self.pay_status = self.meta["status"]
         self.is_paid_ok = self.api.is_paid(self.desired_amount, response=self.meta)
 
+    def update_by_meta(self, meta: dict):
+        self.apply_meta(meta)
         self.save()
 
+    def update(self):
+        self.update_by_meta(self.fetch_meta())
+
+    async def aupdate(self):
+        meta = await self.afetch_meta()
+        # DB 쓰기는 기존 동기 코드를 그대로 사용
+        await sync_to_async(self.update_by_meta)(meta)
+
     class Meta:
         abstract = True
+        indexes = [
+            models.Index(
+                fields=["pay_status", "created_at"],
+                name="%(app_label)s_%(class)s_stale_idx",
+            ),
+        ]
 
 
 class OrderPayment(AbstractPortonePayment):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, db_constraint=False)
 
-    def update(self):
-        super().update()
-
+    def get_order_status(self) -> Optional[str]:
         if self.is_paid_ok:
-            self.order.status = Order.StatusChoices.PAID
+            return Order.StatusChoices.PAID
+        elif self.pay_status in (self.PayStatus.CANCELLED, self.PayStatus.FAILED):
+            return Order.StatusChoices.FAILED_PAYMENT
+        return None
+
+    def update_by_meta(self, meta: dict):
+        super().update_by_meta(meta)
+
+        order_status = self.get_order_status()
+        if order_status is not None:
+            self.order.status = order_status
             self.order.save()
+
+        if self.is_paid_ok:
             self.order.orderpayment_set.exclude(pk=self.pk).delete()
 
-        elif self.pay_status in (self.PayStatus.CANCELLED, self.PayStatus.FAILED):
-            self.order.status = Order.StatusChoices.FAILED_PAYMENT
-            self.order.save()
+    @classmethod
+    def bulk_update_by_meta(
+        cls, payment_meta_list: list[tuple["OrderPayment", dict]]
+    ) -> None:
+        """
+        update_by_meta()와 같은 결과를, 건별 save() 대신 bulk_update로 반영
+        """
+
+        if not payment_meta_list:
+            return
+
+        now = timezone.now()
+        payment_list = []
+        order_list = []
+        paid_payment_list = []
+
+        for payment, meta in payment_meta_list:
+            payment.apply_meta(meta)
+            payment.updated_at = now
+            payment_list.append(payment)
+
+            order_status = payment.get_order_status()
+            if order_status is not None:
+                payment.order.status = order_status
+                payment.order.updated_at = now
+                order_list.append(payment.order)
+
+            if payment.is_paid_ok:
+                paid_payment_list.append(payment)
+
+        with transaction.atomic():
+            cls.objects.bulk_update(
+                payment_list, ["meta", "pay_status", "is_paid_ok", "updated_at"]
+            )
+            Order.objects.bulk_update(order_list, ["status", "updated_at"])
+            if paid_payment_list:
+                cls.objects.filter(
+                    order_id__in=[payment.order_id for payment in paid_payment_list]
+                ).exclude(pk__in=[payment.pk for payment in paid_payment_list]).delete()
 
     @classmethod
     def create_by_order(cls, order: Order) -> "OrderPayment":
@@ -280,3 +540,22 @@ class OrderPayment(AbstractPortonePayment):
             buyer_name=order.user.get_full_name(),
             buyer_email=order.user.email,
         )
+
+
+class PortoneWebhook(models.Model):
+    """
+    포트원 웹훅 수신 큐. apply_pending_webhooks()에서 일괄 반영
+    """
+
+    imp_uid = models.CharField("포트원 거래고유번호", max_length=100, blank=True)
+    merchant_uid = models.UUIDField("결제식별자")
+    status = models.CharField("결제상태", max_length=12)
+    payload = models.JSONField("웹훅 내용", default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    def __str__(self):
+        return f"<{self.pk}> {self.merchant_uid}: {self.status}"
+
+    class Meta:
+        verbose_name = verbose_name_plural = "portone webhook"
@@ -0,0 +1,94 @@
+from django.db import migrations
+
+
+class AlterFieldUniqueConcurrently(migrations.AlterField):
+    """
+    필드에 unique 제약을 추가하는 AlterField.
+    PostgreSQL에서는 CREATE UNIQUE INDEX CONCURRENTLY로 인덱스를 먼저 만든 뒤
+    제약으로 등록하므로, 인덱스를 만드는 동안 테이블 쓰기가 막히지 않는다.
+    PostgreSQL에서는 이 연산을 쓰는 마이그레이션에 atomic = False 지정이 필요.
+    """
+
+    def get_index_name(self, schema_editor, model) -> str:
+        table = model._meta.db_table
+        column = model._meta.get_field(self.name).column
+        return schema_editor._create_index_name(table, [column], suffix="_uniq")
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+
+        to_model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, to_model):
+            return
+
+        table = to_model._meta.db_table
+        column = to_model._meta.get_field(self.name).column
+        index_name = self.get_index_name(schema_editor, to_model)
+
+        quote_name = schema_editor.quote_name
+        schema_editor.execute(
+            f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {quote_name(index_name)} "
+            f"ON {quote_name(table)} ({quote_name(column)})"
+        )
+        schema_editor.execute(
+            f"ALTER TABLE {quote_name(table)} ADD CONSTRAINT {quote_name(index_name)} "
+            f"UNIQUE USING INDEX {quote_name(index_name)}"
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        # AlterField.database_backwards는 database_forwards를 호출하므로 직접 구현
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+
+        from_model = from_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, from_model):
+            return
+
+        # 제약을 지우면 제약이 사용하던 인덱스도 함께 삭제됨
+        table = from_model._meta.db_table
+        index_name = self.get_index_name(schema_editor, from_model)
+        quote_name = schema_editor.quote_name
+        schema_editor.execute(
+            f"ALTER TABLE {quote_name(table)} "
+            f"DROP CONSTRAINT IF EXISTS {quote_name(index_name)}"
+        )
+        schema_editor.execute(f"DROP INDEX IF EXISTS {quote_name(index_name)}")
+
+    def describe(self):
+        return f"Alter field {self.name} on {self.model_name} (unique, concurrently)"
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+    """
+    PostgreSQL에서는 CREATE INDEX CONCURRENTLY로 인덱스를 만드는 AddIndex.
+    다른 DB에서는 AddIndex와 같다.
+    PostgreSQL에서는 이 연산을 쓰는 마이그레이션에 atomic = False 지정이 필요.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.add_index(model, self.index, concurrently=True)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(model, self.index, concurrently=True)
+
+    def describe(self):
+        return super().describe() + " (concurrently)"
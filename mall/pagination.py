@@ -0,0 +1,62 @@
+from typing import Optional
+
+from django.db.models import QuerySet
+
+
+class KeysetPage:
+    """
+    pk 내림차순 keyset 페이지.
+    COUNT(*)와 OFFSET 없이 "pk < cursor" 조건으로 다음 페이지를 조회
+    """
+
+    def __init__(self, object_list: list, cursor: Optional[int], next_cursor):
+        self.object_list = object_list
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+def paginate_by_keyset(
+    queryset: QuerySet, cursor: Optional[int], per_page: int
+) -> KeysetPage:
+    queryset = queryset.order_by("-pk")
+    if cursor is not None:
+        queryset = queryset.filter(pk__lt=cursor)
+
+    # 한 건을 더 조회해서 다음 페이지 존재 여부를 판단
+    object_list = list(queryset[: per_page + 1])
+    if len(object_list) > per_page:
+        object_list = object_list[:per_page]
+        next_cursor = object_list[-1].pk
+    else:
+        next_cursor = None
+    return KeysetPage(object_list, cursor, next_cursor)
+
+
+def paginate_by_offset(queryset: QuerySet, offset: int, per_page: int) -> KeysetPage:
+    """
+    pk 순서가 아닌 목록(검색 결과 등)의 페이지. KeysetPage와 같은 인터페이스로,
+    cursor는 offset 이다. COUNT(*) 없이 한 번의 쿼리로 조회
+    """
+
+    object_list = list(queryset[offset : offset + per_page + 1])
+    if len(object_list) > per_page:
+        object_list = object_list[:per_page]
+        next_cursor = offset + per_page
+    else:
+        next_cursor = None
+    return KeysetPage(object_list, offset or None, next_cursor)
@@ -0,0 +1,313 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+import weakref
+from functools import lru_cache
+
+import httpx
+import requests
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import Signal, receiver
+from iamport import Iamport
+from iamport.client import IAMPORT_API_URL
+
+
+logger = logging.getLogger("portone")
+
+# 포트원 API 호출을 마칠 때마다 발생 (sender=PortoneCallStats, endpoint, elapsed)
+portone_called = Signal()
+
+
+def endpoint_name(imp_url: str, url: str) -> str:
+    # "https://api.iamport.kr/payments/find/{merchant_uid}" -> "payments/find"
+    path = url[len(imp_url) :] if url.startswith(imp_url) else url
+    return "/".join(path.split("/")[:2])
+
+
+class PortoneCallStats:
+    """엔드포인트별 포트원 API 호출 횟수와 누적 지연시간"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def record(self, endpoint: str, elapsed: float):
+        with self._lock:
+            count, total = self._calls.get(endpoint, (0, 0.0))
+            self._calls[endpoint] = (count + 1, total + elapsed)
+        logger.debug("portone %s: %.1fms", endpoint, elapsed * 1000)
+        portone_called.send(sender=self.__class__, endpoint=endpoint, elapsed=elapsed)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                endpoint: {
+                    "count": count,
+                    "total_seconds": total,
+                    "avg_ms": total / count * 1000,
+                }
+                for endpoint, (count, total) in self._calls.items()
+            }
+
+
+class PortoneClient(Iamport):
+    """
+    keep-alive 세션을 재사용하고, access token을 만료 직전까지 캐싱하는 포트원 클라이언트.
+    프로세스 내에서 get_portone_client()로 공유해서 사용한다.
+    """
+
+    # 만료 시각보다 이만큼(초) 일찍 토큰을 재발급
+    token_refresh_margin = 60
+
+    def __init__(
+        self,
+        imp_key,
+        imp_secret,
+        imp_url=IAMPORT_API_URL,
+        pool_maxsize=10,
+        timeout=None,
+        stats=None,
+    ):
+        super().__init__(imp_key, imp_secret, imp_url)
+        self.timeout = timeout
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_maxsize, max_retries=3
+        )
+        self.requests_session.mount("https://", adapter)
+        self.requests_session.mount("http://", adapter)
+        self.stats = stats if stats is not None else PortoneCallStats()
+
+        self._token = None
+        self._token_expires_at = 0.0  # time.monotonic() 기준
+        self._token_lock = threading.Lock()
+
+    def _cached_token(self):
+        if self._token is not None and time.monotonic() < self._token_expires_at:
+            return self._token
+        return None
+
+    def _get_token(self):
+        token = self._cached_token()
+        if token is not None:
+            return token
+
+        # 동시에 만료를 감지한 요청들 중 하나만 토큰을 발급받는다.
+        with self._token_lock:
+            token = self._cached_token()
+            if token is None:
+                token = self._issue_token()
+        return token
+
+    def _issue_token(self):
+        url = "{}users/getToken".format(self.imp_url)
+        payload = {"imp_key": self.imp_key, "imp_secret": self.imp_secret}
+
+        started_at = time.monotonic()
+        response = self.requests_session.post(
+            url,
+            headers={"Content-Type": "application/json"},
+            data=json.dumps(payload),
+            timeout=self.timeout,
+        )
+        self.stats.record("users/getToken", time.monotonic() - started_at)
+        result = self.get_response(response)
+
+        # 서버/로컬 시계 차이에 영향받지 않도록 남은 유효시간으로 계산
+        expires_in = result["expired_at"] - result["now"]
+        self._token = result["access_token"]
+        self._token_expires_at = started_at + expires_in - self.token_refresh_margin
+        return self._token
+
+    def clear_token(self, token=None):
+        """token을 지정하면 그 토큰이 아직 캐싱되어 있을 때만 버림"""
+
+        with self._token_lock:
+            if token is None or token == self._token:
+                self._token = None
+                self._token_expires_at = 0.0
+
+    def _request(self, method, url, **kwargs):
+        # 캐싱된 토큰이 서버에서 먼저 만료된 경우, 1회에 한해 재발급 후 재시도
+        for retry in (False, True):
+            headers = self.get_headers()
+            if method != "GET":
+                headers["Content-Type"] = "application/json"
+
+            started_at = time.monotonic()
+            response = self.requests_session.request(
+                method, url, headers=headers, timeout=self.timeout, **kwargs
+            )
+            elapsed = time.monotonic() - started_at
+            self.stats.record(endpoint_name(self.imp_url, url), elapsed)
+
+            if response.status_code == 401 and not retry:
+                # 다른 요청이 이미 재발급한 토큰은 버리지 않음
+                self.clear_token(headers["Authorization"])
+                continue
+            return self.get_response(response)
+
+    def _get(self, url, payload=None):
+        return self._request("GET", url, params=payload)
+
+    def _post(self, url, payload=None):
+        return self._request("POST", url, data=json.dumps(payload))
+
+    def _delete(self, url):
+        return self._request("DELETE", url)
+
+
+class AsyncPortoneClient:
+    """
+    PortoneClient의 httpx 기반 비동기 버전.
+    httpx.AsyncClient는 이벤트 루프에 묶이므로 get_async_portone_client()로
+    이벤트 루프마다 하나씩 공유해서 사용한다.
+    """
+
+    token_refresh_margin = PortoneClient.token_refresh_margin
+
+    def __init__(
+        self,
+        imp_key,
+        imp_secret,
+        imp_url=IAMPORT_API_URL,
+        pool_maxsize=10,
+        timeout=None,
+        stats=None,
+    ):
+        self.imp_key = imp_key
+        self.imp_secret = imp_secret
+        self.imp_url = imp_url
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=pool_maxsize,
+                max_keepalive_connections=pool_maxsize,
+            ),
+            transport=httpx.AsyncHTTPTransport(retries=3),
+            timeout=timeout,
+        )
+        self.stats = stats if stats is not None else PortoneCallStats()
+
+        self._token = None
+        self._token_expires_at = 0.0  # time.monotonic() 기준
+        self._token_lock = asyncio.Lock()
+
+    @staticmethod
+    def get_response(response: httpx.Response):
+        if response.status_code != httpx.codes.OK:
+            raise Iamport.HttpError(response.status_code, response.reason_phrase)
+        result = response.json()
+        if result["code"] != 0:
+            raise Iamport.ResponseError(result.get("code"), result.get("message"))
+        return result.get("response")
+
+    def _cached_token(self):
+        if self._token is not None and time.monotonic() < self._token_expires_at:
+            return self._token
+        return None
+
+    async def _get_token(self):
+        token = self._cached_token()
+        if token is not None:
+            return token
+
+        async with self._token_lock:
+            token = self._cached_token()
+            if token is None:
+                token = await self._issue_token()
+        return token
+
+    async def _issue_token(self):
+        url = "{}users/getToken".format(self.imp_url)
+        payload = {"imp_key": self.imp_key, "imp_secret": self.imp_secret}
+
+        started_at = time.monotonic()
+        response = await self.http_client.post(url, json=payload)
+        self.stats.record("users/getToken", time.monotonic() - started_at)
+        result = self.get_response(response)
+
+        expires_in = result["expired_at"] - result["now"]
+        self._token = result["access_token"]
+        self._token_expires_at = started_at + expires_in - self.token_refresh_margin
+        return self._token
+
+    def clear_token(self, token=None):
+        if token is None or token == self._token:
+            self._token = None
+            self._token_expires_at = 0.0
+
+    async def _request(self, method, url, **kwargs):
+        for retry in (False, True):
+            headers = {"Authorization": await self._get_token()}
+
+            started_at = time.monotonic()
+            response = await self.http_client.request(
+                method, url, headers=headers, **kwargs
+            )
+            elapsed = time.monotonic() - started_at
+            self.stats.record(endpoint_name(self.imp_url, url), elapsed)
+
+            if response.status_code == 401 and not retry:
+                # 다른 요청이 이미 재발급한 토큰은 버리지 않음
+                self.clear_token(headers["Authorization"])
+                continue
+            return self.get_response(response)
+
+    async def find_by_merchant_uid(self, merchant_uid):
+        url = "{}payments/find/{}".format(self.imp_url, merchant_uid)
+        return await self._request("GET", url)
+
+    async def find_by_imp_uid(self, imp_uid):
+        url = "{}payments/{}".format(self.imp_url, imp_uid)
+        return await self._request("GET", url)
+
+    async def find(self, **kwargs):
+        merchant_uid = kwargs.get("merchant_uid")
+        if merchant_uid:
+            return await self.find_by_merchant_uid(merchant_uid)
+        try:
+            imp_uid = kwargs["imp_uid"]
+        except KeyError:
+            raise KeyError("merchant_uid or imp_uid is required")
+        return await self.find_by_imp_uid(imp_uid)
+
+    async def aclose(self):
+        await self.http_client.aclose()
+
+
+@lru_cache(maxsize=None)
+def get_portone_client() -> PortoneClient:
+    return PortoneClient(
+        imp_key=settings.PORTONE_API_KEY,
+        imp_secret=settings.PORTONE_API_SECRET,
+        imp_url=settings.PORTONE_API_URL,
+        pool_maxsize=settings.PORTONE_POOL_MAXSIZE,
+        timeout=settings.PORTONE_TIMEOUT,
+    )
+
+
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_portone_client() -> AsyncPortoneClient:
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = AsyncPortoneClient(
+            imp_key=settings.PORTONE_API_KEY,
+            imp_secret=settings.PORTONE_API_SECRET,
+            imp_url=settings.PORTONE_API_URL,
+            pool_maxsize=settings.PORTONE_ASYNC_POOL_MAXSIZE,
+            timeout=settings.PORTONE_TIMEOUT,
+            stats=get_portone_client().stats,
+        )
+    return client
+
+
+@receiver(setting_changed)
+def reset_portone_client(setting, **kwargs):
+    if setting.startswith("PORTONE_"):
+        get_portone_client.cache_clear()
+        _async_clients.clear()
@@ -0,0 +1,329 @@
+"""
+네트워크 없이 결제 흐름을 테스트/벤치마크하기 위한 포트원(아임포트) REST API 대역.
+
+지원하는 API:
+- POST /users/getToken
+- GET  /payments/find/{merchant_uid}
+- GET  /payments/{imp_uid}
+- POST /payments/cancel
+
+결제건은 브라우저의 IMP.request_pay() 대신 register_payment()나
+POST /__simulator__/payments 로 등록하고, 등록할 때 지정한 상태 목록(statuses)을
+조회할 때마다 하나씩 진행한다. (예: ["ready", "paid"] → 첫 조회는 ready, 이후 paid)
+응답 지연, 오류 비율, 응답 지연(stall) 비율은 실행 중에도 /__simulator__/config 로 변경 가능.
+
+Django 없이도 import 할 수 있도록 표준 라이브러리만 사용한다.
+settings.PORTONE_API_URL 을 시뮬레이터 주소로 지정해서 사용:
+
+    python manage.py run_portone_simulator --port 8101 --latency-ms 100
+    PORTONE_API_URL=http://127.0.0.1:8101/ python manage.py runserver
+"""
+
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import urlsplit
+from uuid import uuid4
+
+
+@dataclass
+class SimulatorConfig:
+    # 모든 응답에 더하는 지연시간(초)과 그 편차
+    latency: float = 0.0
+    jitter: float = 0.0
+    # 이 비율만큼 error_status로 응답
+    error_rate: float = 0.0
+    error_status: int = 503
+    # 이 비율만큼 stall_seconds 동안 응답하지 않음 (timeout 확인용)
+    stall_rate: float = 0.0
+    stall_seconds: float = 30.0
+    token_ttl: int = 30 * 60
+    # register_payment()에서 statuses를 지정하지 않았을 때의 상태 목록
+    default_statuses: list = field(default_factory=lambda: ["paid"])
+
+
+@dataclass
+class SimulatedPayment:
+    merchant_uid: str
+    amount: int
+    statuses: list
+    imp_uid: str = field(default_factory=lambda: f"imp_{uuid4().hex[:12]}")
+    name: str = ""
+    find_count: int = 0
+    cancel_amount: int = 0
+    cancelled: bool = False
+
+    @property
+    def status(self) -> str:
+        if self.cancelled:
+            return "cancelled"
+        index = min(self.find_count, len(self.statuses)) - 1
+        return self.statuses[max(index, 0)]
+
+    def to_response(self) -> dict:
+        now = int(time.time())
+        status = self.status
+        return {
+            "imp_uid": self.imp_uid,
+            "merchant_uid": self.merchant_uid,
+            "name": self.name,
+            "amount": self.amount,
+            "cancel_amount": self.cancel_amount,
+            "currency": "KRW",
+            "pay_method": "card",
+            "status": status,
+            "paid_at": now if status in ("paid", "cancelled") else 0,
+            "cancelled_at": now if status == "cancelled" else 0,
+            "failed_at": now if status == "failed" else 0,
+        }
+
+
+class PortoneSimulator:
+    def __init__(self, config: Optional[SimulatorConfig] = None):
+        self.config = config or SimulatorConfig()
+        self._lock = threading.Lock()
+        self._payments: dict[str, SimulatedPayment] = {}
+        self._imp_uid_index: dict[str, str] = {}
+        self._tokens: dict[str, float] = {}
+        self.call_counter = Counter()
+        self.server: Optional[SimulatorServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> "PortoneSimulator":
+        """백그라운드 스레드에서 서버 실행. port=0 이면 빈 포트를 사용"""
+
+        self.server = self.make_server(host, port)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def make_server(self, host: str, port: int) -> "SimulatorServer":
+        handler = type("Handler", (SimulatorRequestHandler,), {"simulator": self})
+        return SimulatorServer((host, port), handler)
+
+    def configure(self, **options):
+        with self._lock:
+            for name, value in options.items():
+                if not hasattr(self.config, name):
+                    raise ValueError(f"unknown option: {name}")
+                setattr(self.config, name, value)
+
+    def reset(self):
+        with self._lock:
+            self._payments.clear()
+            self._imp_uid_index.clear()
+            self._tokens.clear()
+            self.call_counter.clear()
+
+    def register_payment(
+        self,
+        merchant_uid: str,
+        amount: int,
+        statuses: Optional[list] = None,
+        name: str = "",
+    ) -> SimulatedPayment:
+        payment = SimulatedPayment(
+            merchant_uid=str(merchant_uid),
+            amount=int(amount),
+            statuses=list(statuses or self.config.default_statuses),
+            name=name,
+        )
+        with self._lock:
+            self._payments[payment.merchant_uid] = payment
+            self._imp_uid_index[payment.imp_uid] = payment.merchant_uid
+        return payment
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": dict(self.call_counter),
+                "payments": len(self._payments),
+                "config": asdict(self.config),
+            }
+
+    # API
+
+    def issue_token(self) -> dict:
+        now = int(time.time())
+        token = uuid4().hex
+        with self._lock:
+            self._tokens[token] = time.monotonic() + self.config.token_ttl
+        return {
+            "access_token": token,
+            "now": now,
+            "expired_at": now + self.config.token_ttl,
+        }
+
+    def is_valid_token(self, token: Optional[str]) -> bool:
+        with self._lock:
+            expires_at = self._tokens.get(token or "")
+        return expires_at is not None and time.monotonic() < expires_at
+
+    def find(
+        self, merchant_uid: Optional[str] = None, imp_uid: Optional[str] = None
+    ) -> Optional[dict]:
+        with self._lock:
+            if merchant_uid is None:
+                merchant_uid = self._imp_uid_index.get(imp_uid)
+            payment = self._payments.get(merchant_uid)
+            if payment is None:
+                return None
+            payment.find_count += 1
+            return payment.to_response()
+
+    def cancel(self, data: dict) -> Optional[dict]:
+        with self._lock:
+            merchant_uid = data.get("merchant_uid") or self._imp_uid_index.get(
+                data.get("imp_uid")
+            )
+            payment = self._payments.get(merchant_uid)
+            if payment is None or payment.cancelled:
+                return None
+            payment.cancelled = True
+            payment.cancel_amount = int(data.get("amount") or payment.amount)
+            return payment.to_response()
+
+
+class SimulatorServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # 클라이언트가 timeout으로 먼저 연결을 끊은 경우는 무시
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+class SimulatorRequestHandler(BaseHTTPRequestHandler):
+    simulator: PortoneSimulator = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def send_json(self, status: int, data: dict):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_api_response(self, response: Optional[dict], message: str = ""):
+        if response is None:
+            self.send_json(404, {"code": -1, "message": message, "response": None})
+        else:
+            self.send_json(200, {"code": 0, "message": None, "response": response})
+
+    def simulate_network(self) -> bool:
+        """지연/오류를 흉내내고, 정상 응답을 계속해야 하면 True"""
+
+        config = self.simulator.config
+        if config.stall_rate and random.random() < config.stall_rate:
+            time.sleep(config.stall_seconds)
+        delay = config.latency + random.uniform(-config.jitter, config.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if config.error_rate and random.random() < config.error_rate:
+            self.send_json(
+                config.error_status,
+                {"code": -1, "message": "simulated error", "response": None},
+            )
+            return False
+        return True
+
+    def check_token(self) -> bool:
+        if self.simulator.is_valid_token(self.headers.get("Authorization")):
+            return True
+        self.send_json(401, {"code": -1, "message": "Unauthorized", "response": None})
+        return False
+
+    def do_GET(self):
+        path = urlsplit(self.path).path.strip("/")
+        if path == "__simulator__/stats":
+            self.send_json(200, self.simulator.stats())
+            return
+
+        parts = path.split("/")
+        if parts[:2] == ["payments", "find"] and len(parts) == 3:
+            endpoint, kwargs = "payments/find", {"merchant_uid": parts[2]}
+        elif parts[0] == "payments" and len(parts) == 2:
+            endpoint, kwargs = "payments", {"imp_uid": parts[1]}
+        else:
+            self.send_json(404, {"code": -1, "message": "not found"})
+            return
+
+        self.simulator.call_counter[endpoint] += 1
+        if not self.simulate_network() or not self.check_token():
+            return
+        self.send_api_response(self.simulator.find(**kwargs), "존재하지 않는 결제정보입니다.")
+
+    def do_POST(self):
+        path = urlsplit(self.path).path.strip("/")
+        data = self.read_json()
+
+        if path.startswith("__simulator__/"):
+            self.handle_control(path.split("/", 1)[1], data)
+            return
+
+        if path == "users/getToken":
+            self.simulator.call_counter[path] += 1
+            if not self.simulate_network():
+                return
+            if not data.get("imp_key") or not data.get("imp_secret"):
+                self.send_json(
+                    401, {"code": -1, "message": "invalid key", "response": None}
+                )
+                return
+            self.send_api_response(self.simulator.issue_token())
+        elif path == "payments/cancel":
+            self.simulator.call_counter[path] += 1
+            if not self.simulate_network() or not self.check_token():
+                return
+            self.send_api_response(self.simulator.cancel(data), "취소할 결제건이 존재하지 않습니다.")
+        else:
+            self.send_json(404, {"code": -1, "message": "not found"})
+
+    def handle_control(self, command: str, data: dict):
+        try:
+            if command == "payments":
+                payment = self.simulator.register_payment(
+                    merchant_uid=data["merchant_uid"],
+                    amount=data["amount"],
+                    statuses=data.get("statuses"),
+                    name=data.get("name", ""),
+                )
+                self.send_json(200, payment.to_response())
+            elif command == "config":
+                self.simulator.configure(**data)
+                self.send_json(200, self.simulator.stats())
+            elif command == "reset":
+                self.simulator.reset()
+                self.send_json(200, self.simulator.stats())
+            else:
+                self.send_json(404, {"message": "not found"})
+        except (KeyError, TypeError, ValueError) as e:
+            self.send_json(400, {"message": str(e)})
@@ -0,0 +1,174 @@
+"""
+상품 검색. 상품명/설명/카테고리명을 미리 색인해둔 mall_product_search 테이블로 검색한다.
+- PostgreSQL: tsvector 컬럼 + GIN 인덱스
+- SQLite: FTS5 가상 테이블 (rowid = 상품 pk)
+그 외 DB에서는 icontains 조회로 대신한다.
+
+색인은 상품/카테고리 저장 시 시그널로 갱신하고, bulk_create 등 시그널이 발생하지 않는
+경로에서는 index_products()를 직접 호출해야 한다. (전체 재색인: rebuild_search_index)
+"""
+
+import re
+from typing import Iterable, Optional
+
+from django.db import connection
+from django.db.models import Q, QuerySet
+
+from mall.models import Category, Product
+
+
+SEARCH_TABLE = "mall_product_search"
+
+# 검색어에서 사용할 최대 단어 수
+MAX_SEARCH_TERMS = 10
+
+
+def get_search_backend() -> Optional[str]:
+    if connection.vendor in ("postgresql", "sqlite"):
+        return connection.vendor
+    return None
+
+
+def get_search_terms(query: str) -> list[str]:
+    return re.findall(r"\w+", query)[:MAX_SEARCH_TERMS]
+
+
+def build_match_query(term_list: list[str]) -> str:
+    # 모든 단어가 (접두어로) 포함된 상품을 검색
+    if get_search_backend() == "postgresql":
+        return " & ".join(f"{term}:*" for term in term_list)
+    return " ".join(f'"{term}"*' for term in term_list)
+
+
+def search_products(queryset: QuerySet, query: str) -> QuerySet:
+    """
+    queryset을 검색어로 필터링하고, 관련도 순으로 정렬해서 반환
+    """
+
+    term_list = get_search_terms(query)
+    if not term_list:
+        return queryset.none()
+
+    backend = get_search_backend()
+    product_table = Product._meta.db_table
+    match_query = build_match_query(term_list)
+
+    if backend == "postgresql":
+        return queryset.extra(
+            select={
+                "search_rank": f"ts_rank({SEARCH_TABLE}.document, "
+                f"to_tsquery('simple', %s))"
+            },
+            select_params=[match_query],
+            tables=[SEARCH_TABLE],
+            where=[
+                f"{SEARCH_TABLE}.product_id = {product_table}.id",
+                f"{SEARCH_TABLE}.document @@ to_tsquery('simple', %s)",
+            ],
+            params=[match_query],
+            order_by=["-search_rank", "-pk"],
+        )
+
+    if backend == "sqlite":
+        # bm25()는 값이 작을수록 관련도가 높음. 상품명 > 카테고리명 > 설명 순으로 가중치
+        return queryset.extra(
+            select={"search_rank": f"bm25({SEARCH_TABLE}, 10.0, 1.0, 5.0)"},
+            tables=[SEARCH_TABLE],
+            where=[
+                f"{SEARCH_TABLE}.rowid = {product_table}.id",
+                f"{SEARCH_TABLE} MATCH %s",
+            ],
+            params=[match_query],
+            order_by=["search_rank", "-pk"],
+        )
+
+    condition = Q()
+    for term in term_list:
+        condition &= (
+            Q(name__icontains=term)
+            | Q(description__icontains=term)
+            | Q(category__name__icontains=term)
+        )
+    return queryset.filter(condition).order_by("-pk")
+
+
+def _index(where: str, params: list):
+    backend = get_search_backend()
+    if backend is None:
+        return
+
+    product_table = Product._meta.db_table
+    category_table = Category._meta.db_table
+
+    with connection.cursor() as cursor:
+        if backend == "postgresql":
+            cursor.execute(
+                f"""
+                INSERT INTO {SEARCH_TABLE} (product_id, document)
+                SELECT
+                    p.id,
+                    setweight(to_tsvector('simple', p.name), 'A')
+                    || setweight(to_tsvector('simple', coalesce(c.name, '')), 'B')
+                    || setweight(to_tsvector('simple', p.description), 'C')
+                FROM {product_table} p
+                LEFT JOIN {category_table} c ON c.id = p.category_id
+                WHERE {where}
+                ON CONFLICT (product_id) DO UPDATE SET document = EXCLUDED.document
+                """,
+                params,
+            )
+        else:
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN "
+                f"(SELECT p.id FROM {product_table} p WHERE {where})",
+                params,
+            )
+            cursor.execute(
+                f"""
+                INSERT INTO {SEARCH_TABLE} (rowid, name, description, category_name)
+                SELECT p.id, p.name, p.description, coalesce(c.name, '')
+                FROM {product_table} p
+                LEFT JOIN {category_table} c ON c.id = p.category_id
+                WHERE {where}
+                """,
+                params,
+            )
+
+
+def index_products(pk_list: Iterable[int]):
+    """지정한 상품들을 DB에서 바로 읽어서 (재)색인"""
+
+    pk_list = list(pk_list)
+    if not pk_list:
+        return
+    placeholders = ", ".join(["%s"] * len(pk_list))
+    _index(f"p.id IN ({placeholders})", pk_list)
+
+
+def index_category(category_pk: int):
+    """카테고리명이 바뀐 경우, 카테고리의 모든 상품을 재색인"""
+
+    _index("p.category_id = %s", [category_pk])
+
+
+def remove_products(pk_list: Iterable[int]):
+    backend = get_search_backend()
+    pk_list = list(pk_list)
+    if backend is None or not pk_list:
+        return
+
+    key_column = "product_id" if backend == "postgresql" else "rowid"
+    placeholders = ", ".join(["%s"] * len(pk_list))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {SEARCH_TABLE} WHERE {key_column} IN ({placeholders})",
+            pk_list,
+        )
+
+
+def rebuild_index():
+    if get_search_backend() is None:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+    _index("1 = 1", [])
@@ -0,0 +1,57 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from mall.cache import invalidate_catalog
+from mall.facets import remove_product_facet, update_product_facet
+from mall.models import Category, Product
+from mall.search import index_category, index_products, remove_products
+from mall.thumbnails import schedule_thumbnail
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def on_catalog_changed(sender, **kwargs):
+    # 커밋 전에 버전을 올리면 그 사이 요청이 바뀌기 전 목록/facet을 새 버전으로 캐싱함
+    transaction.on_commit(invalidate_catalog)
+
+
+@receiver(pre_save, sender=Product)
+def reset_product_thumbnail(sender, instance: Product, **kwargs):
+    if instance.photo_changed:
+        instance.thumbnail_url = ""
+
+
+@receiver(post_save, sender=Product)
+def generate_product_thumbnail(sender, instance: Product, **kwargs):
+    if instance.photo and not instance.thumbnail_url:
+        schedule_thumbnail(instance.pk)
+    instance._loaded_photo_name = instance.photo.name
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance: Product, **kwargs):
+    index_products([instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+def remove_product_index(sender, instance: Product, **kwargs):
+    remove_products([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+def index_category_products(sender, instance: Category, created, **kwargs):
+    if not created:
+        index_category(instance.pk)
+
+
+@receiver(post_save, sender=Product)
+def update_facet(sender, instance: Product, created, **kwargs):
+    update_product_facet(instance, created)
+
+
+@receiver(post_delete, sender=Product)
+def remove_facet(sender, instance: Product, **kwargs):
+    remove_product_facet(instance)
@@ -0,0 +1,74 @@
+import hashlib
+import posixpath
+import re
+from typing import Optional
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+CONTENT_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+@deconstructible
+class ContentHashStorage(FileSystemStorage):
+    """
+    파일 내용의 sha256 해시로 파일명을 정하는 FileSystemStorage.
+    "<upload_to>/ab/cd/abcd....jpg" 형태로 저장하고, 같은 내용의 파일이 이미 있으면
+    다시 쓰지 않고 기존 파일명을 반환한다.
+
+    같은 파일을 여러 레코드가 공유하므로, 레코드를 지울 때 파일을 지우면 안 된다.
+    """
+
+    def get_content_hash(self, content) -> str:
+        hasher = hashlib.sha256()
+        if hasattr(content, "seek"):
+            content.seek(0)
+        for chunk in content.chunks():
+            hasher.update(chunk)
+        content.seek(0)
+        return hasher.hexdigest()
+
+    def get_hashed_name(self, name: str, content_hash: str) -> str:
+        dir_name, file_name = posixpath.split(name)
+        ext = posixpath.splitext(file_name)[1].lower()
+        return posixpath.join(
+            dir_name, content_hash[:2], content_hash[2:4], content_hash + ext
+        )
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+
+        name = self.get_hashed_name(name, self.get_content_hash(content))
+        try:
+            return super().save(name, content, max_length=max_length)
+        except FileExistsError:
+            return name
+
+    def get_available_name(self, name, max_length=None):
+        if self.get_hash_from_name(name) is None:
+            return super().get_available_name(name, max_length=max_length)
+        # 해시 이름은 같은 내용이면 같은 이름이므로, 다른 이름(_abc123 등)을 찾지 않음
+        if self.exists(name):
+            raise FileExistsError(name)
+        return name
+
+    def _save(self, name, content):
+        try:
+            return super()._save(name, content)
+        except FileExistsError:
+            # 다른 스레드/프로세스가 같은 내용을 먼저 저장한 경우
+            return name
+
+    @staticmethod
+    def get_hash_from_name(name: str) -> Optional[str]:
+        # 해시 이름이 아닌 (이전에 저장된) 파일은 None
+        stem = posixpath.splitext(posixpath.basename(name or ""))[0]
+        return stem if CONTENT_HASH_RE.match(stem) else None
+
+
+photo_storage = ContentHashStorage()
@@ -0,0 +1,56 @@
+from django.urls import reverse
+
+from mall.cache import CartSummary, get_cart_summary
+from mall.models import CartProduct
+from mall.tests.test_query_budget import QueryBudgetTestCase
+
+
+class CartSummaryTest(QueryBudgetTestCase):
+    def test_cached(self):
+        self.assertEqual(get_cart_summary(self.user.pk), CartSummary(0, 0))
+
+        CartProduct.objects.create(user=self.user, product=self.product_list[0])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_cart_summary(self.user.pk), CartSummary(0, 0))
+
+    def test_invalidated_on_add_to_cart(self):
+        get_cart_summary(self.user.pk)
+
+        product = self.product_list[1]
+        self.client.post(reverse("add_to_cart", args=[product.pk]) + "?quantity=2")
+        self.assertEqual(get_cart_summary(self.user.pk), CartSummary(1, 2002))
+
+    def test_updated_on_cart_detail(self):
+        cart_product = CartProduct.objects.create(
+            user=self.user, product=self.product_list[2], quantity=1
+        )
+        get_cart_summary(self.user.pk)
+
+        self.client.post(
+            reverse("cart_detail"),
+            {
+                "form-TOTAL_FORMS": 1,
+                "form-INITIAL_FORMS": 1,
+                "form-0-id": cart_product.pk,
+                "form-0-quantity": 3,
+            },
+        )
+        self.assertEqual(get_cart_summary(self.user.pk), CartSummary(1, 3006))
+
+        # 장바구니 페이지에서 조회한 결과로 요약을 갱신
+        self.client.get(reverse("cart_detail"))
+        with self.assertNumQueries(0):
+            self.assertEqual(get_cart_summary(self.user.pk), CartSummary(1, 3006))
+
+    def test_invalidated_on_order_new(self):
+        CartProduct.objects.create(user=self.user, product=self.product_list[0])
+        self.assertEqual(get_cart_summary(self.user.pk), CartSummary(1, 1000))
+
+        self.client.get(reverse("order_new"))
+        self.assertEqual(get_cart_summary(self.user.pk), CartSummary(0, 0))
+
+    def test_badge(self):
+        CartProduct.objects.create(user=self.user, product=self.product_list[0])
+        response = self.client.get(reverse("product_list"))
+        self.assertEqual(response.context["cart_summary"], CartSummary(1, 1000))
+        self.assertContains(response, 'class="badge')
@@ -0,0 +1,93 @@
+from django.contrib.admin.sites import site
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from mall.admin import ProductAdmin
+from mall.facets import get_catalog_facets, refresh_facets
+from mall.models import Category, Product, ProductFacet
+
+
+class ProductFacetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.shirt = Category.objects.create(name="shirt")
+        cls.shoes = Category.objects.create(name="shoes")
+
+    def setUp(self):
+        cache.clear()
+
+    def create_product(self, category, price, status=Product.Status.ACTIVE):
+        return Product.objects.create(
+            category=category, name=f"{category} {price}", price=price, status=status
+        )
+
+    def get_counts(self) -> dict:
+        return {
+            (facet.category_id, facet.price_band): facet.product_count
+            for facet in ProductFacet.objects.filter(product_count__gt=0)
+        }
+
+    def assertFacetsUpToDate(self):
+        counts = self.get_counts()
+        refresh_facets()
+        self.assertEqual(counts, self.get_counts())
+
+    def test_incremental_update(self):
+        product = self.create_product(self.shirt, 5000)
+        self.create_product(self.shirt, 20000)
+        self.create_product(self.shoes, 20000, status=Product.Status.INACTIVE)
+        self.assertEqual(
+            self.get_counts(), {(self.shirt.pk, 0): 1, (self.shirt.pk, 1): 1}
+        )
+
+        product = Product.objects.get(pk=product.pk)
+        product.price = 25000
+        product.save()
+        self.assertEqual(self.get_counts(), {(self.shirt.pk, 1): 2})
+
+        product.category = self.shoes
+        product.status = Product.Status.SOLD_OUT
+        product.save()
+        product.status = Product.Status.ACTIVE
+        product.save()
+        self.assertEqual(
+            self.get_counts(), {(self.shirt.pk, 1): 1, (self.shoes.pk, 1): 1}
+        )
+        self.assertFacetsUpToDate()
+
+        product.delete()
+        self.assertEqual(self.get_counts(), {(self.shirt.pk, 1): 1})
+        self.assertFacetsUpToDate()
+
+    def test_make_active(self):
+        for price in (1000, 2000, 50000):
+            self.create_product(self.shoes, price, status=Product.Status.INACTIVE)
+
+        request = RequestFactory().post("/")
+        product_admin = ProductAdmin(Product, site)
+        product_admin.message_user = lambda *args, **kwargs: None
+        product_admin.make_active(request, Product.objects.filter(price__lt=10000))
+        self.assertEqual(self.get_counts(), {(self.shoes.pk, 0): 2})
+
+    def test_catalog_facets(self):
+        self.create_product(self.shirt, 5000)
+        self.create_product(self.shirt, 20000)
+        self.create_product(self.shoes, 20000)
+
+        category_facet_list, price_facet_list = get_catalog_facets(price_band=1)
+        self.assertEqual(
+            [(facet.label, facet.count) for facet in category_facet_list],
+            [("shirt", 1), ("shoes", 1)],
+        )
+        self.assertEqual(
+            [(facet.value, facet.count, facet.selected) for facet in price_facet_list],
+            [(0, 1, False), (1, 2, True)],
+        )
+
+        response = self.client.get(
+            reverse("product_list"), {"category": self.shirt.pk, "price": 1}
+        )
+        self.assertContains(response, "shirt 20000")
+        self.assertNotContains(response, "shirt 5000")
+        self.assertNotContains(response, "shoes 20000")
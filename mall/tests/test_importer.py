@@ -0,0 +1,106 @@
+import gzip
+import io
+import json
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from mall.importer import (
+    ImportCheckpoint,
+    iter_item_dicts,
+    iter_items_from_path,
+    iter_json_array,
+)
+
+
+class ImportCheckpointTest(SimpleTestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = Path(temp_dir.name) / "checkpoint.sqlite3"
+
+    def open(self, database_id: str) -> ImportCheckpoint:
+        checkpoint = ImportCheckpoint(self.path, database_id)
+        self.addCleanup(checkpoint.close)
+        return checkpoint
+
+    def test_database_changed(self):
+        checkpoint = self.open("sqlite:::/tmp/a.db")
+        checkpoint.save("source", 3, {"key": "hash"})
+        checkpoint.close()
+
+        checkpoint = self.open("sqlite:::/tmp/a.db")
+        self.assertEqual(checkpoint.get_offset("source"), 3)
+        self.assertEqual(checkpoint.get_hashes(["key"]), {"key": "hash"})
+        checkpoint.close()
+
+        # 다른 DB에 반영한 기록으로 건너뛰지 않음
+        checkpoint = self.open("sqlite:::/tmp/b.db")
+        self.assertEqual(checkpoint.get_offset("source"), 0)
+        self.assertEqual(checkpoint.get_hashes(["key"]), {})
+
+
+class ItemReaderTest(SimpleTestCase):
+    item_list = [
+        {
+            "category_name": "category",
+            "name": f'product {i} ["special", chars]',
+            "price": 1000 * (i + 1),
+            "priceUnit": "원",
+            "desc": "",
+            "photo_path": "",
+        }
+        for i in range(3)
+    ]
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = Path(temp_dir.name)
+
+    def test_json_array(self):
+        content = json.dumps(self.item_list, ensure_ascii=False, indent=2)
+        # 원소/숫자가 읽는 단위의 경계에서 잘리는 경우
+        for chunk_size in (1, 2, 7, 64 * 1024):
+            with self.subTest(chunk_size=chunk_size):
+                item_list = list(iter_json_array(io.StringIO(content), chunk_size))
+                self.assertEqual(item_list, self.item_list)
+        self.assertEqual(list(iter_json_array(io.StringIO("[1, 23]"), 1)), [1, 23])
+
+    def test_empty_array(self):
+        self.assertEqual(list(iter_json_array(io.StringIO(" [ ] "))), [])
+        self.assertEqual(list(iter_item_dicts(io.StringIO(""))), [])
+
+    def test_invalid_array(self):
+        for content in [
+            "[1 2]",
+            '[{"a": 1} {"a": 2}]',
+            "[1,]",
+            "[,1]",
+            "[1, 2",
+            "[",
+            "{}",
+        ]:
+            with self.subTest(content=content):
+                with self.assertRaises(ValueError):
+                    list(iter_json_array(io.StringIO(content), chunk_size=2))
+
+    def test_json_lines(self):
+        content = "\n".join(
+            json.dumps(item, ensure_ascii=False) for item in self.item_list
+        )
+        item_list = list(iter_item_dicts(io.StringIO(f"\n{content}\n\n")))
+        self.assertEqual(item_list, self.item_list)
+
+    def test_gzip(self):
+        with gzip.open(self.temp_dir / "items.json.gz", "wt", encoding="utf-8") as fp:
+            json.dump(self.item_list[:2], fp, ensure_ascii=False)
+        with gzip.open(self.temp_dir / "items.jsonl.gz", "wt", encoding="utf-8") as fp:
+            fp.write(json.dumps(self.item_list[2], ensure_ascii=False) + "\n")
+
+        item_list = list(iter_items_from_path(self.temp_dir))
+        self.assertEqual(
+            [item.name for item in item_list],
+            [item["name"] for item in self.item_list],
+        )
@@ -0,0 +1,66 @@
+import threading
+
+from asgiref.sync import iscoroutinefunction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import User
+from config.metrics import MetricsMiddleware, db_query_count, request_duration
+
+
+class MetricsMiddlewareTest(TestCase):
+    def setUp(self):
+        for histogram in (request_duration, db_query_count):
+            histogram.clear()
+            self.addCleanup(histogram.clear)
+
+    def test_sync(self):
+        middleware = MetricsMiddleware(lambda request: HttpResponse("ok"))
+        self.assertFalse(iscoroutinefunction(middleware))
+
+        response = middleware(RequestFactory().get("/"))
+        self.assertEqual(response.content, b"ok")
+        self.assertIn('view="<unresolved>"', "\n".join(request_duration.render()))
+
+    async def test_async(self):
+        event_loop_thread = threading.current_thread()
+        view_thread_list = []
+
+        async def get_response(request):
+            view_thread_list.append(threading.current_thread())
+            await User.objects.acount()
+            return HttpResponse("ok")
+
+        # 비동기 체인에서는 스레드로 넘기지 않고 이벤트 루프에서 바로 실행
+        middleware = MetricsMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(RequestFactory().get("/"))
+        self.assertEqual(response.content, b"ok")
+        self.assertEqual(view_thread_list, [event_loop_thread])
+        # sync_to_async로 다른 스레드에서 실행한 쿼리도 집계
+        self.assertIn(
+            'django_view_db_queries_sum{view="<unresolved>"} 1',
+            "\n".join(db_query_count.render()),
+        )
+
+
+class MetricsViewTest(TestCase):
+    def get(self, **extra):
+        return self.client.get(reverse("metrics"), **extra)
+
+    def test_not_allowed(self):
+        # 프록시 뒤에서는 모든 요청이 127.0.0.1 이므로 기본으로 허용하지 않음
+        self.assertEqual(self.get(REMOTE_ADDR="127.0.0.1").status_code, 404)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_token(self):
+        response = self.get(HTTP_AUTHORIZATION="Bearer secret")
+        self.assertContains(response, "django_view_duration_seconds")
+        self.assertEqual(self.get(HTTP_AUTHORIZATION="Bearer wrong").status_code, 404)
+        self.assertEqual(self.get().status_code, 404)
+
+    @override_settings(METRICS_ALLOWED_IPS=["10.0.0.5"])
+    def test_allowed_ips(self):
+        self.assertEqual(self.get(REMOTE_ADDR="10.0.0.5").status_code, 200)
+        self.assertEqual(self.get(REMOTE_ADDR="127.0.0.1").status_code, 404)
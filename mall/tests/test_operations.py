@@ -0,0 +1,108 @@
+from unittest import mock
+
+from django.db import models
+from django.db.migrations.state import ModelState, ProjectState
+from django.test import SimpleTestCase
+
+from mall.operations import AddIndexConcurrently, AlterFieldUniqueConcurrently
+
+
+class AlterFieldUniqueConcurrentlyTest(SimpleTestCase):
+    def setUp(self):
+        self.operation = AlterFieldUniqueConcurrently(
+            model_name="payment",
+            name="uid",
+            field=models.UUIDField(unique=True),
+        )
+        self.from_state = ProjectState()
+        self.from_state.add_model(
+            ModelState("test_app", "Payment", [("uid", models.UUIDField())])
+        )
+        self.to_state = self.from_state.clone()
+        self.operation.state_forwards("test_app", self.to_state)
+
+    def get_schema_editor(self) -> mock.Mock:
+        # PostgreSQL 없이 실행되는 SQL만 확인
+        schema_editor = mock.Mock()
+        schema_editor.connection.vendor = "postgresql"
+        schema_editor.connection.alias = "default"
+        schema_editor.quote_name = lambda name: f'"{name}"'
+        schema_editor._create_index_name = lambda table, columns, suffix: (
+            f"{table}_{columns[0]}{suffix}"
+        )
+        return schema_editor
+
+    def get_sql_list(self, schema_editor) -> list[str]:
+        return [call.args[0] for call in schema_editor.execute.call_args_list]
+
+    def test_postgresql(self):
+        schema_editor = self.get_schema_editor()
+        self.operation.database_forwards(
+            "test_app", schema_editor, self.from_state, self.to_state
+        )
+        self.assertEqual(
+            self.get_sql_list(schema_editor),
+            [
+                'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS "test_app_payment_uid_uniq" '
+                'ON "test_app_payment" ("uid")',
+                'ALTER TABLE "test_app_payment" ADD CONSTRAINT "test_app_payment_uid_uniq" '
+                'UNIQUE USING INDEX "test_app_payment_uid_uniq"',
+            ],
+        )
+
+        schema_editor = self.get_schema_editor()
+        self.operation.database_backwards(
+            "test_app", schema_editor, self.to_state, self.from_state
+        )
+        self.assertEqual(
+            self.get_sql_list(schema_editor),
+            [
+                'ALTER TABLE "test_app_payment" '
+                'DROP CONSTRAINT IF EXISTS "test_app_payment_uid_uniq"',
+                'DROP INDEX IF EXISTS "test_app_payment_uid_uniq"',
+            ],
+        )
+
+
+class AddIndexConcurrentlyTest(SimpleTestCase):
+    def setUp(self):
+        self.index = models.Index(fields=["status"], name="test_app_payment_idx")
+        self.operation = AddIndexConcurrently(model_name="payment", index=self.index)
+        self.from_state = ProjectState()
+        self.from_state.add_model(
+            ModelState("test_app", "Payment", [("status", models.CharField())])
+        )
+        self.to_state = self.from_state.clone()
+        self.operation.state_forwards("test_app", self.to_state)
+
+    def get_schema_editor(self, vendor: str) -> mock.Mock:
+        schema_editor = mock.Mock()
+        schema_editor.connection.vendor = vendor
+        schema_editor.connection.alias = "default"
+        return schema_editor
+
+    def test_postgresql(self):
+        schema_editor = self.get_schema_editor("postgresql")
+        self.operation.database_forwards(
+            "test_app", schema_editor, self.from_state, self.to_state
+        )
+        model, index = schema_editor.add_index.call_args.args
+        self.assertEqual(model._meta.db_table, "test_app_payment")
+        self.assertEqual(index, self.index)
+        self.assertEqual(
+            schema_editor.add_index.call_args.kwargs, {"concurrently": True}
+        )
+
+        self.operation.database_backwards(
+            "test_app", schema_editor, self.to_state, self.from_state
+        )
+        self.assertEqual(
+            schema_editor.remove_index.call_args.kwargs, {"concurrently": True}
+        )
+
+    def test_other_database(self):
+        schema_editor = self.get_schema_editor("sqlite")
+        self.operation.database_forwards(
+            "test_app", schema_editor, self.from_state, self.to_state
+        )
+        self.assertEqual(schema_editor.add_index.call_args.kwargs, {})
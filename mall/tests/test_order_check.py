@@ -0,0 +1,78 @@
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404
+from django.test import AsyncRequestFactory, override_settings
+from django.urls import reverse
+
+from mall import views
+from mall.models import Order, OrderPayment
+from mall.portone import get_async_portone_client
+from mall.portone_simulator import PortoneSimulator
+from mall.tests.test_query_budget import QueryBudgetTestCase
+
+
+class OrderCheckAsyncTest(QueryBudgetTestCase):
+    """PORTONE_ASYNC_CHECK 설정 시의 결제 확인 뷰를 포트원 시뮬레이터로 확인"""
+
+    def setUp(self):
+        super().setUp()
+        self.simulator = PortoneSimulator().start()
+        self.addCleanup(self.simulator.stop)
+        settings_override = override_settings(
+            PORTONE_API_URL=self.simulator.url,
+            PORTONE_API_KEY="imp_key",
+            PORTONE_API_SECRET="imp_secret",
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.order = self.create_order(10)
+        self.payment = OrderPayment.create_by_order(self.order)
+
+    @async_to_sync
+    async def check(self, user, payment_pk: int):
+        # urls.py는 설정에 따라 한 번만 뷰를 고르므로 비동기 뷰를 직접 호출
+        url = reverse("order_check", args=[self.order.pk, payment_pk])
+        request = AsyncRequestFactory().get(url)
+        request.user = user
+        try:
+            return await views.order_check_async(request, self.order.pk, payment_pk)
+        finally:
+            # 이벤트 루프별로 만든 클라이언트의 연결을 정리
+            await get_async_portone_client().aclose()
+
+    def test_paid(self):
+        self.simulator.register_payment(
+            self.payment.merchant_uid, self.order.total_amount, ["paid"]
+        )
+
+        # 결제 조회, 결제/주문 저장, 다른 결제 삭제 (세션/사용자 조회 제외)
+        with self.assertMaxQueries(4):
+            response = self.check(self.user, self.payment.pk)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, self.order.get_absolute_url())
+
+        self.payment.refresh_from_db()
+        self.order.refresh_from_db()
+        self.assertEqual(self.payment.pay_status, OrderPayment.PayStatus.PAID)
+        self.assertEqual(self.order.status, Order.StatusChoices.PAID)
+        self.assertEqual(self.simulator.call_counter["users/getToken"], 1)
+        self.assertEqual(self.simulator.call_counter["payments/find"], 1)
+
+    def test_not_found(self):
+        # 포트원에 결제내역이 없음
+        with self.assertRaises(Http404):
+            self.check(self.user, self.payment.pk)
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.pay_status, OrderPayment.PayStatus.READY)
+
+        # 다른 주문의 결제건
+        with self.assertRaises(Http404):
+            self.check(self.user, self.payment.pk + 1)
+
+    def test_anonymous(self):
+        response = self.check(AnonymousUser(), self.payment.pk)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.url.startswith(settings.LOGIN_URL))
+        self.assertEqual(self.simulator.call_counter["payments/find"], 0)
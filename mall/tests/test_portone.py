@@ -0,0 +1,65 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import SimpleTestCase
+
+from mall.portone import PortoneClient
+from mall.portone_simulator import PortoneSimulator
+
+
+class PortoneClientTokenTest(SimpleTestCase):
+    concurrency = 40
+
+    def setUp(self):
+        self.simulator = PortoneSimulator().start()
+        self.addCleanup(self.simulator.stop)
+        self.simulator.register_payment("merchant-1", 1000)
+        self.client = PortoneClient(
+            "imp_key",
+            "imp_secret",
+            imp_url=self.simulator.url,
+            pool_maxsize=self.concurrency,
+            timeout=5,
+        )
+
+    def find_concurrently(self):
+        # 토큰 발급 중에 다른 요청들이 도착하도록 응답을 지연
+        self.simulator.configure(latency=0.05)
+        with ThreadPoolExecutor(self.concurrency) as executor:
+            meta_list = list(
+                executor.map(
+                    lambda _: self.client.find(merchant_uid="merchant-1"),
+                    range(self.concurrency),
+                )
+            )
+        self.assertTrue(all(meta["status"] == "paid" for meta in meta_list))
+
+    def test_concurrent_find(self):
+        self.find_concurrently()
+        self.assertEqual(self.simulator.call_counter["users/getToken"], 1)
+        self.assertEqual(self.simulator.call_counter["payments/find"], self.concurrency)
+
+    def test_token_cached_until_expiry(self):
+        self.simulator.configure(token_ttl=1)
+        self.client.token_refresh_margin = 0
+
+        self.client.find(merchant_uid="merchant-1")
+        self.client.find(merchant_uid="merchant-1")
+        self.assertEqual(self.simulator.call_counter["users/getToken"], 1)
+
+        time.sleep(1.1)
+        self.client.find(merchant_uid="merchant-1")
+        self.assertEqual(self.simulator.call_counter["users/getToken"], 2)
+
+    def test_token_expired_on_server(self):
+        self.client.find(merchant_uid="merchant-1")
+
+        # 서버에서 토큰이 먼저 만료되면 401을 받은 요청들이 한 번만 재발급
+        self.simulator.reset()
+        self.simulator.register_payment("merchant-1", 1000)
+        self.find_concurrently()
+        self.assertEqual(self.simulator.call_counter["users/getToken"], 1)
+        # 요청마다 재시도는 최대 1회
+        self.assertLessEqual(
+            self.simulator.call_counter["payments/find"], self.concurrency * 2
+        )
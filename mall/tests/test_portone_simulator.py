@@ -0,0 +1,53 @@
+from django.test import SimpleTestCase
+from iamport import Iamport
+
+from mall.portone import PortoneClient
+from mall.portone_simulator import PortoneSimulator
+
+
+class PortoneSimulatorTest(SimpleTestCase):
+    def setUp(self):
+        self.simulator = PortoneSimulator().start()
+        self.addCleanup(self.simulator.stop)
+        self.client = PortoneClient(
+            "imp_key", "imp_secret", imp_url=self.simulator.url, timeout=5
+        )
+
+    def test_status_transition(self):
+        self.simulator.register_payment("merchant-1", 1000, ["ready", "paid"])
+
+        meta = self.client.find(merchant_uid="merchant-1")
+        self.assertEqual(meta["status"], "ready")
+        meta = self.client.find(merchant_uid="merchant-1")
+        self.assertEqual(meta["status"], "paid")
+        self.assertTrue(self.client.is_paid(1000, response=meta))
+
+        meta = self.client.cancel("test", merchant_uid="merchant-1")
+        self.assertEqual(meta["status"], "cancelled")
+        self.assertEqual(meta["cancel_amount"], 1000)
+
+        # 토큰은 한 번만 발급
+        self.assertEqual(self.simulator.stats()["calls"]["users/getToken"], 1)
+
+    def test_not_found(self):
+        with self.assertRaises(Iamport.HttpError):
+            self.client.find(merchant_uid="unknown")
+
+    def test_token_expired_on_server(self):
+        self.simulator.register_payment("merchant-1", 1000)
+        self.client.find(merchant_uid="merchant-1")
+
+        # 서버에서 토큰이 먼저 만료되면 1회 재발급 후 재시도
+        self.simulator.reset()
+        self.simulator.register_payment("merchant-1", 1000)
+        meta = self.client.find(merchant_uid="merchant-1")
+        self.assertEqual(meta["status"], "paid")
+        self.assertEqual(self.simulator.stats()["calls"]["users/getToken"], 1)
+
+    def test_error_rate(self):
+        self.simulator.register_payment("merchant-1", 1000)
+        self.simulator.configure(error_rate=1.0)
+
+        with self.assertRaises(Iamport.HttpError) as cm:
+            self.client.find(merchant_uid="merchant-1")
+        self.assertEqual(cm.exception.code, 503)
@@ -0,0 +1,83 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from config.metrics import product_card_cache
+from mall.cache import get_catalog_version, get_or_render_product_cards
+from mall.models import Category, Product
+
+
+class ProductCardCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="category")
+        for i in range(3):
+            Product.objects.create(
+                category=cls.category,
+                name=f"product {i}",
+                price=1000,
+                status=Product.Status.ACTIVE,
+            )
+
+    def setUp(self):
+        cache.clear()
+        product_card_cache.clear()
+
+    def get_cards(self) -> list[str]:
+        product_list = list(Product.objects.select_related("category"))
+        return get_or_render_product_cards(
+            product_list, lambda product: f"{product.name} {product.price}"
+        )
+
+    def test_cached(self):
+        self.assertEqual(
+            self.get_cards(),
+            ["product 2 1000", "product 1 1000", "product 0 1000"],
+        )
+        self.assertEqual(product_card_cache.get("miss"), 3)
+
+        # 바뀌지 않은 카드는 다시 렌더링하지 않음
+        product = Product.objects.get(name="product 1")
+        product.price = 2000
+        product.save()
+        self.assertEqual(
+            self.get_cards(),
+            ["product 2 1000", "product 1 2000", "product 0 1000"],
+        )
+        self.assertEqual(product_card_cache.get("hit"), 2)
+        self.assertEqual(product_card_cache.get("miss"), 4)
+
+    def test_category_renamed(self):
+        self.get_cards()
+        self.category.name = "renamed"
+        self.category.save()
+        self.get_cards()
+        self.assertEqual(product_card_cache.get("miss"), 6)
+
+    def test_product_list(self):
+        self.client.get(reverse("product_list"))
+        self.assertEqual(product_card_cache.get("miss"), 3)
+
+        # 상품 목록 페이지 캐시가 무효화되어도 카드는 캐시에서 가져옴
+        version = get_catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(
+                category=self.category,
+                name="new product",
+                price=1000,
+                status=Product.Status.ACTIVE,
+            )
+            # 목록 버전은 커밋 후에 바뀜
+            self.assertEqual(get_catalog_version(), version)
+        self.assertNotEqual(get_catalog_version(), version)
+        response = self.client.get(reverse("product_list"))
+        self.assertContains(response, "new product")
+        self.assertContains(response, "product 0")
+        self.assertEqual(product_card_cache.get("hit"), 3)
+        self.assertEqual(product_card_cache.get("miss"), 4)
+
+        with self.settings(METRICS_TOKEN="secret"):
+            response = self.client.get(
+                reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret"
+            )
+        self.assertContains(response, 'mall_product_card_cache_total{result="hit"} 3')
@@ -0,0 +1,353 @@
+from contextlib import contextmanager
+from math import ceil
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import User
+from mall.models import (
+    Category,
+    Product,
+    CartProduct,
+    Order,
+    OrderedProduct,
+    OrderPayment,
+)
+from mall.portone import PortoneClient
+
+# 데이터 크기와 무관하게 쿼리 수가 일정해야 하므로 여러 크기로 확인
+SIZES = [1, 10, 50]
+
+
+class QueryBudgetTestCase(TestCase):
+    """
+    뷰별 최대 쿼리 수(budget)를 확인하는 테스트의 공통 데이터/헬퍼.
+    로그인한 요청은 세션 조회 1회 + 사용자 조회 1회가 기본으로 포함된다.
+    """
+
+    # 미리 만들어두는 상품 수
+    product_count = max(SIZES)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="buyer", password="password", email="buyer@example.com"
+        )
+        category = Category.objects.create(name="category")
+        cls.product_list = Product.objects.bulk_create(
+            [
+                Product(
+                    category=category,
+                    name=f"product {i:03d}",
+                    price=1000 + i,
+                    status=Product.Status.ACTIVE,
+                )
+                for i in range(cls.product_count)
+            ]
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    @contextmanager
+    def assertMaxQueries(self, budget: int):
+        with CaptureQueriesContext(connection) as context:
+            yield context
+
+        query_count = len(context.captured_queries)
+        if query_count > budget:
+            sql_list = "\n".join(
+                f"{i}. {query['sql']}"
+                for i, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(f"{query_count} queries executed, budget {budget}\n{sql_list}")
+
+    def fill_cart(self, size: int):
+        CartProduct.objects.bulk_create(
+            [
+                CartProduct(user=self.user, product=product, quantity=2)
+                for product in self.product_list[:size]
+            ]
+        )
+
+    def create_order(self, size: int) -> Order:
+        product_list = self.product_list[:size]
+        order = Order.objects.create(
+            user=self.user,
+            total_amount=sum(product.price for product in product_list),
+            name=Order.make_name(product_list[0].name, size),
+            item_count=size,
+        )
+        OrderedProduct.objects.bulk_create(
+            [
+                OrderedProduct(
+                    order=order,
+                    product=product,
+                    name=product.name,
+                    price=product.price,
+                    quantity=1,
+                )
+                for product in product_list
+            ]
+        )
+        return order
+
+
+class ProductListQueryTest(QueryBudgetTestCase):
+    def test_product_list(self):
+        # 세션 + 사용자, 상품 페이지 조회, facet 조회, 장바구니 요약 집계(캐시 미스)
+        with self.assertMaxQueries(5):
+            response = self.client.get(reverse("product_list"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_product_list_next_page(self):
+        cursor = self.product_list[10].pk
+        with self.assertMaxQueries(5):
+            response = self.client.get(reverse("product_list"), {"cursor": cursor})
+        self.assertEqual(response.status_code, 200)
+
+    def test_product_list_cached(self):
+        self.client.get(reverse("product_list"))
+
+        # 캐싱된 상품 목록과 장바구니 요약은 조회하지 않음
+        with self.assertMaxQueries(2):
+            self.client.get(reverse("product_list"))
+
+    def test_product_list_filtered(self):
+        self.client.get(reverse("product_list"))
+
+        # 필터를 바꾸면 상품 페이지만 조회 (facet, 장바구니 요약은 캐시)
+        product = self.product_list[-1]
+        with self.assertMaxQueries(3):
+            response = self.client.get(
+                reverse("product_list"),
+                {"category": product.category_id, "price": 0},
+            )
+        self.assertContains(response, product.name)
+
+    def test_product_list_anonymous(self):
+        self.client.logout()
+        with self.assertMaxQueries(2):
+            response = self.client.get(reverse("product_list"))
+        self.assertEqual(response.status_code, 200)
+
+
+class AddToCartQueryTest(QueryBudgetTestCase):
+    def test_add_to_cart(self):
+        product = self.product_list[0]
+        for _ in range(2):
+            # 세션 + 사용자, upsert
+            with self.assertMaxQueries(3):
+                response = self.client.post(
+                    reverse("add_to_cart", args=[product.pk]) + "?quantity=3"
+                )
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(CartProduct.objects.get(user=self.user).quantity, 6)
+
+    def test_add_to_cart_bulk(self):
+        for size in SIZES:
+            with self.subTest(size=size):
+                item_list = [
+                    {"product": product.pk, "quantity": 1}
+                    for product in self.product_list[:size]
+                ]
+                with self.assertMaxQueries(3):
+                    response = self.client.post(
+                        reverse("add_to_cart_bulk"),
+                        item_list,
+                        content_type="application/json",
+                    )
+                self.assertEqual(response.json(), {"count": size})
+
+
+class CartDetailQueryTest(QueryBudgetTestCase):
+    def get_post_data(self, quantity: int) -> dict:
+        cart_product_list = CartProduct.objects.filter(user=self.user).order_by(
+            "product__name"
+        )
+        data = {
+            "form-TOTAL_FORMS": len(cart_product_list),
+            "form-INITIAL_FORMS": len(cart_product_list),
+        }
+        for i, cart_product in enumerate(cart_product_list):
+            data[f"form-{i}-id"] = cart_product.pk
+            data[f"form-{i}-quantity"] = quantity
+        return data
+
+    def test_cart_detail(self):
+        for size in SIZES:
+            with self.subTest(size=size):
+                CartProduct.objects.all().delete()
+                self.fill_cart(size)
+
+                # 세션 + 사용자, 장바구니 조회
+                with self.assertMaxQueries(3):
+                    response = self.client.get(reverse("cart_detail"))
+                self.assertEqual(len(response.context["formset"]), size)
+
+    def test_cart_detail_update(self):
+        for size in SIZES:
+            with self.subTest(size=size):
+                CartProduct.objects.all().delete()
+                self.fill_cart(size)
+                data = self.get_post_data(quantity=5)
+
+                # 세션 + 사용자, 장바구니 조회, SAVEPOINT 생성/해제, 수량 변경
+                with self.assertMaxQueries(6):
+                    response = self.client.post(reverse("cart_detail"), data)
+                self.assertRedirects(
+                    response, reverse("cart_detail"), fetch_redirect_response=False
+                )
+                self.assertEqual(
+                    set(
+                        CartProduct.objects.filter(user=self.user).values_list(
+                            "quantity", flat=True
+                        )
+                    ),
+                    {5},
+                )
+
+    def test_cart_detail_delete(self):
+        for size in SIZES:
+            with self.subTest(size=size):
+                CartProduct.objects.all().delete()
+                self.fill_cart(size)
+                data = self.get_post_data(quantity=2)
+                for i in range(0, size, 2):
+                    data[f"form-{i}-DELETE"] = "on"
+
+                # 세션 + 사용자, 장바구니 조회, SAVEPOINT 생성/해제, 삭제
+                with self.assertMaxQueries(6):
+                    response = self.client.post(reverse("cart_detail"), data)
+                self.assertEqual(response.status_code, 302)
+                self.assertEqual(
+                    CartProduct.objects.filter(user=self.user).count(), size // 2
+                )
+
+
+class OrderNewQueryTest(QueryBudgetTestCase):
+    # 장바구니 상품 수와 무관하게 주문상품은 bulk_create로 생성
+    sizes = [1, 10, 500]
+    product_count = max(sizes)
+
+    def get_budget(self, size: int) -> int:
+        # SQLite는 bulk_create를 쿼리 파라미터 한도에 맞춰 나눠서 실행
+        fields = [
+            field
+            for field in OrderedProduct._meta.concrete_fields
+            if not field.primary_key
+        ]
+        batch_size = connection.ops.bulk_batch_size(fields, [None] * size)
+        bulk_insert_count = ceil(size / batch_size)
+
+        # 세션 + 사용자, SAVEPOINT 생성/해제, 장바구니 조회, 주문 생성,
+        # 주문상품 생성, 장바구니 삭제
+        return 2 + 2 + 3 + bulk_insert_count
+
+    def test_order_new(self):
+        for size in self.sizes:
+            with self.subTest(size=size):
+                self.fill_cart(size)
+
+                with self.assertMaxQueries(self.get_budget(size)):
+                    response = self.client.get(reverse("order_new"))
+
+                order = Order.objects.latest("pk")
+                self.assertRedirects(
+                    response,
+                    reverse("order_pay", args=[order.pk]),
+                    fetch_redirect_response=False,
+                )
+                self.assertEqual(order.item_count, size)
+                self.assertEqual(order.orderedproduct_set.count(), size)
+                self.assertEqual(
+                    order.total_amount,
+                    sum(product.price * 2 for product in self.product_list[:size]),
+                )
+                self.assertFalse(CartProduct.objects.filter(user=self.user).exists())
+
+
+class OrderPayQueryTest(QueryBudgetTestCase):
+    def test_order_pay(self):
+        for size in SIZES:
+            with self.subTest(size=size):
+                order = self.create_order(size)
+
+                # 세션 + 사용자, 주문 조회, 결제 생성, 장바구니 요약 집계(캐시 미스)
+                with self.assertMaxQueries(5):
+                    response = self.client.get(reverse("order_pay", args=[order.pk]))
+                self.assertEqual(response.status_code, 200)
+
+
+class OrderCheckQueryTest(QueryBudgetTestCase):
+    def test_order_check(self):
+        for size in SIZES:
+            with self.subTest(size=size):
+                order = self.create_order(size)
+                payment = OrderPayment.create_by_order(order)
+                # 포트원 API는 호출하지 않고 결제완료 응답으로 대체
+                meta = {
+                    "merchant_uid": payment.merchant_uid,
+                    "status": "paid",
+                    "amount": order.total_amount,
+                }
+
+                with mock.patch.object(PortoneClient, "find", return_value=meta):
+                    # 세션 + 사용자, 결제 조회, 결제/주문 저장, 다른 결제 삭제
+                    with self.assertMaxQueries(6):
+                        response = self.client.get(
+                            reverse("order_check", args=[order.pk, payment.pk])
+                        )
+                self.assertRedirects(
+                    response, order.get_absolute_url(), fetch_redirect_response=False
+                )
+                order.refresh_from_db()
+                self.assertEqual(order.status, Order.StatusChoices.PAID)
+
+
+class OrderListQueryTest(QueryBudgetTestCase):
+    def test_order_list(self):
+        order_list = []
+        for size in SIZES:
+            with self.subTest(size=size):
+                for _ in range(size - len(order_list)):
+                    order = self.create_order(size)
+                    OrderPayment.create_by_order(order)
+                    order_list.append(order)
+
+                # 세션 + 사용자, COUNT, 주문 조회, 주문상품 조회, 장바구니 요약 집계(캐시 미스)
+                cache.clear()
+                with self.assertMaxQueries(6):
+                    response = self.client.get(reverse("order_list"))
+                self.assertContains(response, order_list[-1].name)
+                self.assertContains(response, "미결제")
+
+
+class OrderDetailQueryTest(QueryBudgetTestCase):
+    def test_order_detail(self):
+        for size in SIZES:
+            with self.subTest(size=size):
+                order = self.create_order(size)
+
+                # 세션 + 사용자, 주문 조회, 주문상품 조회, 결제내역 조회,
+                # 장바구니 요약 집계(캐시 미스)
+                with self.assertMaxQueries(6):
+                    response = self.client.get(order.get_absolute_url())
+                self.assertContains(response, self.product_list[size - 1].name)
+
+    def test_order_detail_finished(self):
+        order = self.create_order(10)
+        order.status = Order.StatusChoices.DELIVERED
+        order.save()
+        self.client.get(order.get_absolute_url())
+
+        # 배송완료 주문은 캐싱된 HTML을 사용하므로 주문만 조회
+        with self.assertMaxQueries(3):
+            response = self.client.get(order.get_absolute_url())
+        self.assertContains(response, self.product_list[9].name)
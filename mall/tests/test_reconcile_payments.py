@@ -0,0 +1,83 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import User
+from mall.models import Order, OrderPayment
+from mall.portone_simulator import PortoneSimulator
+
+
+class ReconcilePaymentsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="buyer", password="password", email="buyer@example.com"
+        )
+
+    def setUp(self):
+        self.simulator = PortoneSimulator().start()
+        self.addCleanup(self.simulator.stop)
+        settings_override = override_settings(
+            PORTONE_API_URL=self.simulator.url,
+            PORTONE_API_KEY="imp_key",
+            PORTONE_API_SECRET="imp_secret",
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def create_payment(self) -> OrderPayment:
+        order = Order.objects.create(user=self.user, total_amount=1000, name="order")
+        payment = OrderPayment.create_by_order(order)
+        OrderPayment.objects.filter(pk=payment.pk).update(
+            created_at=timezone.now() - timedelta(hours=1)
+        )
+        return payment
+
+    def reconcile(self) -> str:
+        stdout = StringIO()
+        call_command("reconcile_payments", "--rate=0", stdout=stdout)
+        return stdout.getvalue()
+
+    def test_reconcile(self):
+        paid_payment = self.create_payment()
+        self.simulator.register_payment(paid_payment.merchant_uid, 1000, ["paid"])
+        # 결제창을 열지 않아 포트원에 없는 결제건
+        unknown_payment = self.create_payment()
+
+        output = self.reconcile()
+        self.assertIn("1 updated, 1 not found", output)
+
+        paid_payment.refresh_from_db()
+        unknown_payment.refresh_from_db()
+        self.assertEqual(paid_payment.pay_status, OrderPayment.PayStatus.PAID)
+        self.assertEqual(paid_payment.order.status, Order.StatusChoices.PAID)
+        self.assertEqual(unknown_payment.pay_status, OrderPayment.PayStatus.FAILED)
+        self.assertEqual(unknown_payment.order.status, Order.StatusChoices.REQUESTED)
+
+        # 처리한 결제건은 다시 조회하지 않음
+        self.assertIn("checked 0 payments", self.reconcile())
+
+    def test_network_error(self):
+        payment = self.create_payment()
+        self.simulator.register_payment(payment.merchant_uid, 1000, ["paid"])
+
+        # 응답하지 않는 포트원: 타임아웃은 실패로 세고 다른 결제건 확인을 계속
+        self.simulator.configure(stall_rate=1, stall_seconds=1)
+        with override_settings(PORTONE_TIMEOUT=0.1):
+            self.assertIn(
+                "0 updated, 0 not found (marked failed), 1 failed", self.reconcile()
+            )
+
+        # 5xx 오류
+        self.simulator.configure(stall_rate=0, error_rate=1, error_status=503)
+        self.assertIn("1 failed", self.reconcile())
+
+        payment.refresh_from_db()
+        self.assertEqual(payment.pay_status, OrderPayment.PayStatus.READY)
+
+        # 포트원이 복구되면 다음 주기에 반영
+        self.simulator.configure(error_rate=0)
+        self.assertIn("1 updated", self.reconcile())
@@ -0,0 +1,57 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from mall.models import Category, Product
+from mall.search import search_products
+
+
+class ProductSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="과일")
+        cls.apple = Product.objects.create(
+            category=cls.category,
+            name="사과 apple",
+            description="빨간 사과",
+            price=1000,
+            status=Product.Status.ACTIVE,
+        )
+        cls.banana = Product.objects.create(
+            category=cls.category,
+            name="바나나 banana",
+            description="노란 바나나 apple 아님",
+            price=2000,
+            status=Product.Status.ACTIVE,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, query: str) -> list:
+        return list(search_products(Product.objects.all(), query))
+
+    def test_search(self):
+        # 상품명 일치가 설명 일치보다 먼저
+        self.assertEqual(self.search("apple"), [self.apple, self.banana])
+        self.assertEqual(self.search("바나"), [self.banana])
+        self.assertEqual(self.search("과일 banana"), [self.banana])
+        self.assertEqual(self.search("없는상품"), [])
+        self.assertEqual(self.search('"*'), [])
+
+    def test_index_updated(self):
+        self.apple.name = "풋사과"
+        self.apple.save()
+        self.assertEqual(self.search("풋사과"), [self.apple])
+
+        self.category.name = "fruit"
+        self.category.save()
+        self.assertCountEqual(self.search("fruit"), [self.apple, self.banana])
+
+        self.banana.delete()
+        self.assertEqual(self.search("fruit"), [self.apple])
+
+    def test_product_list(self):
+        response = self.client.get(reverse("product_list"), {"q": "banana"})
+        self.assertContains(response, "바나나 banana")
+        self.assertNotContains(response, "사과 apple")
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+
+from mall.storage import ContentHashStorage
+
+
+class ContentHashStorageTest(SimpleTestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.storage = ContentHashStorage(location=temp_dir.name)
+
+    def save(self, content: bytes) -> str:
+        return self.storage.save("photo/a.JPG", ContentFile(content))
+
+    def test_same_content(self):
+        name = self.save(b"photo")
+        self.assertEqual(self.save(b"photo"), name)
+        self.assertNotEqual(self.save(b"other"), name)
+        self.assertTrue(name.endswith(".jpg"))
+        self.assertIsNotNone(self.storage.get_hash_from_name(name))
+
+    def test_concurrent_save(self):
+        content = os.urandom(1024 * 1024)
+        # 모든 스레드가 해시를 계산한 뒤 동시에 저장을 시작하도록 맞춤
+        barrier = threading.Barrier(8)
+        get_content_hash = self.storage.get_content_hash
+
+        def wait_and_get_content_hash(content):
+            content_hash = get_content_hash(content)
+            barrier.wait(timeout=5)
+            return content_hash
+
+        with mock.patch.object(
+            self.storage, "get_content_hash", wait_and_get_content_hash
+        ), ThreadPoolExecutor(max_workers=8) as executor:
+            name_set = set(executor.map(self.save, [content] * 8))
+
+        # 동시에 저장해도 이름이 바뀐 중복 파일을 만들지 않음
+        self.assertEqual(len(name_set), 1)
+        name = name_set.pop()
+        dir_name = os.path.dirname(self.storage.path(name))
+        self.assertEqual(os.listdir(dir_name), [os.path.basename(name)])
+        with self.storage.open(name) as fp:
+            self.assertEqual(fp.read(), content)
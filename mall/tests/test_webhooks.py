@@ -0,0 +1,102 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from iamport import Iamport
+
+from accounts.models import User
+from mall.models import Order, OrderPayment, PortoneWebhook
+from mall.portone import PortoneClient
+from mall.webhooks import apply_pending_webhooks
+
+
+class ApplyWebhookTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="buyer", password="password", email="buyer@example.com"
+        )
+
+    def setUp(self):
+        order = Order.objects.create(user=self.user, total_amount=1000, name="order")
+        self.payment = OrderPayment.create_by_order(order)
+
+    def queue(self, *status_list: str):
+        for status in status_list:
+            PortoneWebhook.objects.create(
+                merchant_uid=self.payment.uid, status=status, payload={}
+            )
+
+    def apply(self, status: str) -> mock.Mock:
+        meta = {
+            "merchant_uid": self.payment.merchant_uid,
+            "status": status,
+            "amount": self.payment.desired_amount,
+        }
+        with mock.patch.object(PortoneClient, "find", return_value=meta) as find:
+            apply_pending_webhooks()
+        self.payment.refresh_from_db()
+        return find
+
+    def test_out_of_order(self):
+        # 결제완료 알림보다 ready 알림이 늦게 도착
+        self.queue("paid", "ready")
+        find = self.apply("paid")
+
+        self.assertEqual(find.call_count, 1)
+        self.assertEqual(self.payment.pay_status, OrderPayment.PayStatus.PAID)
+        self.assertEqual(self.payment.order.status, Order.StatusChoices.PAID)
+        self.assertFalse(
+            PortoneWebhook.objects.filter(processed_at__isnull=True).exists()
+        )
+
+    def test_duplicate(self):
+        self.queue("paid", "paid")
+        self.assertEqual(self.apply("paid").call_count, 1)
+
+        # 이미 반영된 상태의 알림은 다시 조회하지 않음
+        self.queue("paid")
+        self.assertEqual(self.apply("paid").call_count, 0)
+        self.assertEqual(self.payment.pay_status, OrderPayment.PayStatus.PAID)
+
+    def test_ready_only(self):
+        self.queue("ready")
+        self.assertEqual(self.apply("ready").call_count, 0)
+        self.assertEqual(self.payment.pay_status, OrderPayment.PayStatus.READY)
+
+    def test_fetch_failed(self):
+        # 포트원 장애로 조회에 실패하면 웹훅을 남겨두고 다음 처리 때 재시도
+        self.queue("paid")
+        error = Iamport.HttpError(503, "Service Unavailable")
+        with mock.patch.object(PortoneClient, "find", side_effect=error):
+            self.assertEqual(apply_pending_webhooks(), 0)
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.pay_status, OrderPayment.PayStatus.READY)
+        self.assertTrue(
+            PortoneWebhook.objects.filter(processed_at__isnull=True).exists()
+        )
+
+        self.assertEqual(self.apply("paid").call_count, 1)
+        self.assertEqual(self.payment.pay_status, OrderPayment.PayStatus.PAID)
+        self.assertFalse(
+            PortoneWebhook.objects.filter(processed_at__isnull=True).exists()
+        )
+
+
+class PortoneWebhookViewTest(TestCase):
+    def post(self, data: dict):
+        return self.client.post(
+            reverse("portone_webhook"), data, content_type="application/json"
+        )
+
+    def test_webhook(self):
+        merchant_uid = "9b0c6cf5-4a07-4ac2-9f5f-2a2f2d8f0e3c"
+        response = self.post({"merchant_uid": merchant_uid, "status": "paid"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(PortoneWebhook.objects.get().status, "paid")
+
+        response = self.post({"merchant_uid": merchant_uid, "status": "x" * 20})
+        self.assertEqual(response.status_code, 400)
+        response = self.post({"status": "paid"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(PortoneWebhook.objects.count(), 1)
@@ -0,0 +1,69 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from sorl.thumbnail import get_thumbnail
+
+from mall.cache import invalidate_catalog
+from mall.models import Product
+
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_GEOMETRY = "250x250"
+THUMBNAIL_OPTIONS = {"crop": "center"}
+
+
+@lru_cache(maxsize=None)
+def get_thumbnail_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(
+        max_workers=settings.MALL_THUMBNAIL_WORKERS,
+        thread_name_prefix="thumbnail",
+    )
+
+
+def generate_thumbnail(product_pk: int, invalidate: bool = True) -> Optional[str]:
+    """
+    상품 사진의 썸네일을 생성해서 Product.thumbnail_url에 저장하고, 그 주소를 반환
+    """
+
+    product = Product.objects.filter(pk=product_pk).only("photo").first()
+    if product is None or not product.photo:
+        return None
+
+    thumb = get_thumbnail(product.photo, THUMBNAIL_GEOMETRY, **THUMBNAIL_OPTIONS)
+
+    # 생성하는 동안 사진이 바뀌었다면 저장하지 않음
+    Product.objects.filter(pk=product_pk, photo=product.photo.name).update(
+        thumbnail_url=thumb.url,
+        updated_at=timezone.now(),
+    )
+    if invalidate:
+        invalidate_catalog()
+    return thumb.url
+
+
+def _generate_thumbnail_in_worker(product_pk: int):
+    try:
+        generate_thumbnail(product_pk)
+    except Exception as e:
+        logger.error(f"thumbnail failed: product {product_pk}", exc_info=e)
+    finally:
+        # 워커 스레드의 DB 연결 정리
+        connection.close()
+
+
+def schedule_thumbnail(product_pk: int):
+    if not settings.MALL_THUMBNAIL_ASYNC:
+        generate_thumbnail(product_pk)
+        return
+
+    transaction.on_commit(
+        lambda: get_thumbnail_executor().submit(
+            _generate_thumbnail_in_worker, product_pk
+        )
+    )
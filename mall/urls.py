@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
@@ -6,12 +7,15 @@ urlpatterns = [
     path("", views.product_list, name="product_list"),
     path("cart", views.cart_detail, name="cart_detail"),
     path("cart/<int:product_pk>/add/", views.add_to_cart, name="add_to_cart"),
+    path("cart/add/", views.add_to_cart_bulk, name="add_to_cart_bulk"),
     path("order/new/", views.order_new, name="order_new"),
     path("order/<int:pk>/pay/", views.order_pay, name="order_pay"),
     path(
         "orders/<int:order_pk>/check/<int:payment_pk>/",
-        views.order_check,
+        views.order_check_async if settings.PORTONE_ASYNC_CHECK else views.order_check,
         name="order_check",
     ),
+    path("orders/", views.order_list, name="order_list"),
     path("orders/<int:pk>/", views.order_detail, name="order_detail"),
+    path("portone/webhook/", views.portone_webhook, name="portone_webhook"),
 ]
@@ -1,15 +1,57 @@
+import hashlib
+import json
+from typing import Optional
+from urllib.parse import urlencode
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.forms import modelformset_factory
-from django.http import HttpResponse
+from django.contrib.auth.views import redirect_to_login
+from django.core.paginator import Paginator
+from django.db.models import (
+    F,
+    OuterRef,
+    Prefetch,
+    Subquery,
+    Sum,
+    Window,
+    prefetch_related_objects,
+)
+from django.http import HttpResponse, Http404, HttpResponseBadRequest, JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
+from django.template.loader import render_to_string
 from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 from django.views.generic import ListView
 
-from mall.forms import CartProductForm
-from mall.models import Product, CartProduct, Order, OrderPayment
+from mall.cache import (
+    CartSummary,
+    get_or_render_catalog_page,
+    get_or_render_order_detail,
+    get_or_render_product_cards,
+    invalidate_cart_summary,
+    set_cart_summary,
+)
+from mall.facets import PRICE_BAND_COUNT, filter_products, get_catalog_facets
+from mall.forms import CartProductFormSet
+from mall.models import (
+    Product,
+    CartProduct,
+    Order,
+    OrderedProduct,
+    OrderPayment,
+    PortoneWebhook,
+)
+from mall.pagination import paginate_by_keyset, paginate_by_offset
+from mall.search import search_products
+
+# add_to_cart_bulk에서 한 번에 담을 수 있는 상품 수
+MAX_CART_BULK_SIZE = 100
+ORDER_LIST_PAGE_SIZE = 10
+ORDER_LIST_PRODUCT_COUNT = 3
 
 
 # Create your views here.
@@ -30,9 +72,131 @@ class ProductListView(ListView):
         "category"
     )
     template_name = "mall/product_list.html"
+    catalog_template_name = "mall/_product_catalog.html"
+    card_template_name = "mall/_product_card.html"
     context_object_name = "product_list"
     paginate_by = 4
 
+    def get_cursor(self) -> Optional[int]:
+        try:
+            return int(self.request.GET["cursor"])
+        except (KeyError, ValueError):
+            return None
+
+    def get_search_query(self) -> str:
+        return self.request.GET.get("q", "").strip()
+
+    def get_filters(self) -> dict[str, Optional[int]]:
+        """카테고리/가격대 필터. 잘못된 값은 무시"""
+
+        filters = {"category": None, "price": None}
+        for name in filters:
+            try:
+                value = int(self.request.GET[name])
+            except (KeyError, ValueError):
+                continue
+            if value < 0 or (name == "price" and value >= PRICE_BAND_COUNT):
+                continue
+            filters[name] = value
+        return filters
+
+    def get_query_string(self, **params) -> str:
+        """현재 검색어/필터에 params를 덮어쓴 쿼리스트링 (페이지 위치는 제외)"""
+
+        query_dict = {"q": self.get_search_query(), **self.get_filters(), **params}
+        return urlencode(
+            {
+                name: value
+                for name, value in query_dict.items()
+                if value not in ("", None)
+            }
+        )
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        filters = self.get_filters()
+        queryset = filter_products(queryset, filters["category"], filters["price"])
+        search_query = self.get_search_query()
+        if search_query:
+            queryset = search_products(queryset, search_query)
+        return queryset
+
+    def get_page_key(self) -> str:
+        filters = self.get_filters()
+        filter_key = f"category={filters['category']}:price={filters['price']}"
+        search_query = self.get_search_query()
+        if search_query:
+            query_hash = hashlib.md5(search_query.encode("utf-8")).hexdigest()
+            return f"{filter_key}:q={query_hash}:cursor={self.get_cursor()}"
+        if settings.MALL_CATALOG_PAGINATION == "keyset":
+            return f"{filter_key}:cursor={self.get_cursor()}"
+        return f"{filter_key}:page={self.request.GET.get(self.page_kwarg, 1)}"
+
+    def get_facets(self) -> dict:
+        filters = self.get_filters()
+        category_facet_list, price_facet_list = get_catalog_facets(
+            filters["category"], filters["price"]
+        )
+        # 선택된 항목을 다시 누르면 해당 필터를 해제
+        return {
+            "category": [
+                (
+                    facet,
+                    self.get_query_string(
+                        category=None if facet.selected else facet.value
+                    ),
+                )
+                for facet in category_facet_list
+            ],
+            "price": [
+                (
+                    facet,
+                    self.get_query_string(
+                        price=None if facet.selected else facet.value
+                    ),
+                )
+                for facet in price_facet_list
+            ],
+        }
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.get_search_query():
+            # 검색 결과는 관련도 순이므로 offset으로 조회 (cursor = offset)
+            page = paginate_by_offset(queryset, self.get_cursor() or 0, page_size)
+            return None, page, page.object_list, page.has_other_pages()
+
+        if settings.MALL_CATALOG_PAGINATION != "keyset":
+            return super().paginate_queryset(queryset, page_size)
+
+        # COUNT(*)와 OFFSET 스캔 없이 (status, -pk) 인덱스로 다음 페이지 조회
+        page = paginate_by_keyset(queryset, self.get_cursor(), page_size)
+        return None, page, page.object_list, page.has_other_pages()
+
+    def render_product_card(self, product: Product) -> str:
+        return render_to_string(self.card_template_name, {"product": product})
+
+    def get_context_data(self, **kwargs):
+        # 상품 목록 영역은 렌더링된 HTML을 캐싱하고, 캐시 미스일 때만 조회/렌더링
+        search_query = self.get_search_query()
+
+        def render_catalog():
+            context = super(ProductListView, self).get_context_data(**kwargs)
+            context["search_query"] = search_query
+            context["filter_query"] = self.get_query_string()
+            context["facets"] = self.get_facets()
+            context["product_card_list"] = get_or_render_product_cards(
+                context["product_list"], self.render_product_card
+            )
+            return render_to_string(self.catalog_template_name, context)
+
+        return {
+            "view": self,
+            "search_query": search_query,
+            "catalog_html": get_or_render_catalog_page(
+                self.get_page_key(), render_catalog
+            ),
+        }
+
 
 product_list = ProductListView.as_view()
 
@@ -40,24 +204,47 @@ product_list = ProductListView.as_view()
 @login_required
 @require_POST
 def add_to_cart(request, product_pk):
-    product_qs = Product.objects.filter(
-        status=Product.Status.ACTIVE,
-    )
-    product = get_object_or_404(product_qs, pk=product_pk)
+    try:
+        quantity = int(request.GET.get("quantity", 1))
+    except ValueError:
+        return HttpResponseBadRequest("invalid quantity")
+    if quantity < 1:
+        return HttpResponseBadRequest("invalid quantity")
 
-    quantify = int(request.GET.get("quantity", 1))
+    if not CartProduct.add(request.user, {product_pk: quantity}):
+        raise Http404("No Product matches the given query.")
+    invalidate_cart_summary(request.user.pk)
 
-    cart_product, is_created = CartProduct.objects.get_or_create(
-        user=request.user,
-        product=product,
-        defaults={"quantity": quantify},
-    )
+    return HttpResponse("ok")
 
-    if not is_created:
-        cart_product.quantity += quantify
-        cart_product.save()
 
-    return HttpResponse("ok")
+@login_required
+@require_POST
+def add_to_cart_bulk(request):
+    """
+    여러 상품을 한 번에 장바구니에 담기
+    요청 본문: [{"product": 1, "quantity": 2}, ...]
+    """
+
+    try:
+        item_list = json.loads(request.body)
+        quantity_dict = {}
+        for item in item_list:
+            product_pk = int(item["product"])
+            quantity = int(item.get("quantity", 1))
+            if quantity < 1:
+                raise ValueError(quantity)
+            quantity_dict[product_pk] = quantity_dict.get(product_pk, 0) + quantity
+    except (TypeError, KeyError, ValueError, AttributeError):
+        return HttpResponseBadRequest("invalid cart items")
+
+    if len(quantity_dict) > MAX_CART_BULK_SIZE:
+        return HttpResponseBadRequest("too many cart items")
+
+    count = CartProduct.add(request.user, quantity_dict)
+    if count:
+        invalidate_cart_summary(request.user.pk)
+    return JsonResponse({"count": count})
 
 
 @login_required
@@ -67,13 +254,14 @@ def cart_detail(request):
             user=request.user,
         )
         .select_related("product")
+        .annotate(
+            line_amount=F("product__price") * F("quantity"),
+            # 장바구니 합계도 같은 쿼리에서 계산
+            cart_total=Window(Sum(F("product__price") * F("quantity"))),
+        )
         .order_by("product__name")
     )
 
-    CartProductFormSet = modelformset_factory(
-        model=CartProduct, form=CartProductForm, can_delete=True, extra=0
-    )
-
     if request.method == "POST":
         formset = CartProductFormSet(
             data=request.POST,
@@ -81,6 +269,7 @@ def cart_detail(request):
         )
         if formset.is_valid():
             formset.save()
+            invalidate_cart_summary(request.user.pk)
             messages.success(request, "updated cart")
             return redirect("cart_detail")
     else:
@@ -88,11 +277,17 @@ def cart_detail(request):
             queryset=cart_product_qs,
         )
 
+    cart_product_list = formset.get_queryset()
+    cart_total = cart_product_list[0].cart_total if cart_product_list else 0
+    # 이미 조회한 장바구니로 요약을 갱신해서, 헤더에서 다시 집계하지 않도록 함
+    set_cart_summary(request.user.pk, CartSummary(len(cart_product_list), cart_total))
+
     return render(
         request,
         "mall/cart_detail.html",
         {
             "formset": formset,
+            "cart_total": cart_total,
         },
     )
 
@@ -102,14 +297,16 @@ def order_new(request):
     cart_product_qs = CartProduct.objects.filter(user=request.user)
 
     order = Order.create_form_cart(request.user, cart_product_qs)
-    cart_product_qs.delete()
+    invalidate_cart_summary(request.user.pk)
 
     return redirect("order_pay", order.pk)
 
 
 @login_required()
 def order_pay(request, pk):
-    order = get_object_or_404(Order, pk=pk, user=request.user)
+    order = get_object_or_404(
+        Order.objects.select_related("user"), pk=pk, user=request.user
+    )
 
     if not order.can_pay():
         messages.error(request, "결제 할 수 없는 주문")
@@ -138,13 +335,126 @@ def order_pay(request, pk):
 
 @login_required
 def order_check(request, order_pk, payment_pk):
-    payment = get_object_or_404(OrderPayment, pk=payment_pk, order__user=request.user)
+    payment = get_object_or_404(
+        OrderPayment.objects.select_related("order"),
+        pk=payment_pk,
+        order__user=request.user,
+    )
     payment.update()
     # return redirect("order_detail", order_pk)
     return redirect("order_detail", order_pk)
 
 
+async def order_check_async(request, order_pk, payment_pk):
+    # login_required는 Django 4.2에서 비동기 뷰를 지원하지 않음
+    user = await sync_to_async(
+        lambda: request.user if request.user.is_authenticated else None
+    )()
+    if user is None:
+        return redirect_to_login(request.get_full_path())
+
+    try:
+        payment = await OrderPayment.objects.select_related("order").aget(
+            pk=payment_pk, order__user=user
+        )
+    except OrderPayment.DoesNotExist:
+        raise Http404("No OrderPayment matches the given query.")
+
+    await payment.aupdate()
+    return redirect("order_detail", order_pk)
+
+
+@csrf_exempt
+@require_POST
+def portone_webhook(request):
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return HttpResponseBadRequest("invalid json")
+    else:
+        data = request.POST.dict()
+
+    try:
+        merchant_uid = UUID(data["merchant_uid"])
+        status = data["status"]
+    except (KeyError, TypeError, ValueError):
+        return HttpResponseBadRequest("merchant_uid and status are required")
+    if status not in OrderPayment.PayStatus.values:
+        return HttpResponseBadRequest("invalid status")
+
+    PortoneWebhook.objects.create(
+        imp_uid=data.get("imp_uid") or "",
+        merchant_uid=merchant_uid,
+        status=status,
+        payload=data,
+    )
+    return HttpResponse("ok")
+
+
+@login_required
+def order_list(request):
+    """
+    주문 내역. 주문 수와 무관하게 COUNT, 주문 조회, 주문상품 조회 3회로 처리.
+    주문명/상품 수/결제금액은 주문 생성 시 저장해둔 값을 사용하고,
+    주문상품은 주문별로 앞의 ORDER_LIST_PRODUCT_COUNT개만 조회
+    """
+
+    latest_payment_qs = OrderPayment.objects.filter(order=OuterRef("pk")).order_by(
+        "-created_at", "-pk"
+    )
+    order_qs = (
+        Order.objects.filter(user=request.user)
+        .annotate(
+            latest_pay_status=Subquery(latest_payment_qs.values("pay_status")[:1])
+        )
+        .prefetch_related(
+            Prefetch(
+                "orderedproduct_set",
+                queryset=OrderedProduct.objects.only(
+                    "order_id", "name", "quantity"
+                ).order_by("pk")[:ORDER_LIST_PRODUCT_COUNT],
+                to_attr="ordered_product_list",
+            )
+        )
+        .order_by("-created_at")
+    )
+    page = Paginator(order_qs, ORDER_LIST_PAGE_SIZE).get_page(request.GET.get("page"))
+    pay_status_labels = dict(OrderPayment.PayStatus.choices)
+    for order in page:
+        order.latest_pay_status_display = pay_status_labels.get(
+            order.latest_pay_status, ""
+        )
+        order.more_product_count = order.item_count - len(order.ordered_product_list)
+
+    return render(request, "mall/order_list.html", {"page_obj": page})
+
+
 @login_required
 def order_detail(request, pk):
     order = get_object_or_404(Order, pk=pk, user=request.user)
-    return render(request, "mall/order_detail.html", {"order": order})
+
+    def render_order():
+        # 주문상품(소계는 DB에서 계산)과 결제내역을 한 번씩 조회
+        prefetch_related_objects(
+            [order],
+            Prefetch(
+                "orderedproduct_set",
+                queryset=OrderedProduct.objects.annotate(
+                    subtotal=F("price") * F("quantity")
+                ).order_by("pk"),
+                to_attr="ordered_product_list",
+            ),
+            Prefetch(
+                "orderpayment_set",
+                queryset=OrderPayment.objects.defer("meta").order_by("-created_at"),
+                to_attr="payment_list",
+            ),
+        )
+        return render_to_string("mall/_order_detail.html", {"order": order})
+
+    return render(
+        request,
+        "mall/order_detail.html",
+        {"order": order, "order_html": get_or_render_order_detail(order, render_order)},
+    )
@@ -0,0 +1,77 @@
+import logging
+
+from django.http import Http404
+from django.utils import timezone
+from requests import RequestException
+
+from mall.models import OrderPayment, PortoneWebhook
+
+
+logger = logging.getLogger(__name__)
+
+
+def apply_pending_webhooks(batch_size: int = 100) -> int:
+    """
+    처리 대기 중인 웹훅을 batch_size 만큼 OrderPayment/Order에 일괄 반영하고,
+    처리한 웹훅 개수를 반환.
+
+    웹훅 내용은 위변조될 수 있으므로 결제상태는 포트원 API로 재확인한다.
+    ready 알림(결제 이후에 늦게 도착한 경우 포함)은 무시하고, 결제건별로 받은
+    알림이 모두 이미 반영된 상태와 같으면(중복 수신) API 호출 없이 건너뛴다.
+    """
+
+    webhook_list = list(
+        PortoneWebhook.objects.filter(processed_at__isnull=True).order_by("pk")[
+            :batch_size
+        ]
+    )
+    if not webhook_list:
+        return 0
+
+    # 결제건별로 받은 결제상태. 수신 순서는 보장되지 않으므로 마지막 알림만 보지 않음
+    status_dict: dict[str, set] = {}
+    for webhook in webhook_list:
+        if webhook.status != OrderPayment.PayStatus.READY:
+            status_dict.setdefault(webhook.merchant_uid, set()).add(webhook.status)
+
+    payment_qs = OrderPayment.objects.filter_by_merchant_uids(
+        status_dict.keys()
+    ).select_related("order")
+
+    payment_meta_list = []
+    failed_uid_set = set()
+    for payment in payment_qs:
+        if status_dict[payment.uid] == {payment.pay_status}:
+            continue
+
+        try:
+            meta = payment.fetch_meta()
+        except (Http404, RequestException):
+            # 조회에 실패한 결제건(포트원 장애 등)은 웹훅을 남겨두고 다음 처리 때 재시도
+            failed_uid_set.add(payment.uid)
+            continue
+        payment_meta_list.append((payment, meta))
+
+    OrderPayment.bulk_update_by_meta(payment_meta_list)
+
+    processed_pk_list = [
+        webhook.pk
+        for webhook in webhook_list
+        if webhook.merchant_uid not in failed_uid_set
+    ]
+    PortoneWebhook.objects.filter(pk__in=processed_pk_list).update(
+        processed_at=timezone.now()
+    )
+
+    if failed_uid_set:
+        logger.warning(
+            "failed to fetch %d payments, %d webhooks left pending",
+            len(failed_uid_set),
+            len(webhook_list) - len(processed_pk_list),
+        )
+    logger.info(
+        "applied %d webhooks (%d payments updated)",
+        len(processed_pk_list),
+        len(payment_meta_list),
+    )
+    return len(processed_pk_list)
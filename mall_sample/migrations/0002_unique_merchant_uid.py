@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:35
+
+from django.db import migrations, models
+import uuid
+
+from mall.operations import AlterFieldUniqueConcurrently
+
+
+class Migration(migrations.Migration):
+    # PostgreSQL의 CREATE INDEX CONCURRENTLY는 트랜잭션 안에서 실행할 수 없음
+    atomic = False
+
+    dependencies = [
+        ("mall_sample", "0001_initial"),
+    ]
+
+    operations = [
+        AlterFieldUniqueConcurrently(
+            model_name="payment",
+            name="uid",
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+    ]
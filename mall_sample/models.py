@@ -1,12 +1,14 @@
 import logging
 from uuid import uuid4
 
-from django.conf import settings
 from django.core.validators import MinValueValidator
 from django.db import models
 from django.http import Http404
 from iamport import Iamport
 
+from mall.models import PortonePaymentQuerySet
+from mall.portone import get_portone_client
+
 
 logger = logging.getLogger("portone")
 
@@ -18,7 +20,7 @@ class Payment(models.Model):
         CANCELLED = "cancelled", "결제취소"
         FAILED = "failed", "결제실패"
 
-    uid = models.UUIDField(default=uuid4, editable=False)
+    uid = models.UUIDField(default=uuid4, editable=False, unique=True)
     name = models.CharField(max_length=50)
     amount = models.PositiveIntegerField(
         validators=[
@@ -34,16 +36,15 @@ class Payment(models.Model):
     )
     is_paid_ok = models.BooleanField(default=False, editable=False, db_index=True)
 
+    objects = PortonePaymentQuerySet.as_manager()
+
     @property
     def merchant_uid(self):
         return str(self.uid)
 
     def portone_check(self, commit=True):
-        api = Iamport(
-            imp_key=settings.PORTONE_API_KEY, imp_secret=settings.PORTONE_API_SECRET
-        )
+        api = get_portone_client()
 
-        print(api)
         try:
             meta = api.find(merchant_uid=self.merchant_uid)
         except (Iamport.ResponseError, Iamport.HttpError) as e: